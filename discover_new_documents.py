@@ -24,6 +24,9 @@ Usage:
     # Fresh start (clear checkpoints)
     python3 discover_new_documents.py --from-date 01/01/2025 --fresh
 
+    # Fresh start that also refetches pages cached under http_cache/
+    python3 discover_new_documents.py --from-date 01/01/2025 --fresh --no-cache
+
     # Limit total documents across all weeks
     python3 discover_new_documents.py --from-date 01/01/2025 --limit 10
 
@@ -33,20 +36,29 @@ Usage:
     # Single document mode (by số hiệu)
     python3 discover_new_documents.py --so-hieu "100/2024/ND-CP"
 
+    # Process documents with 8 concurrent workers
+    python3 discover_new_documents.py --from-date 01/01/2025 --workers 8
+
     # Show stats from previous runs
     python3 discover_new_documents.py --stats
 """
 
 import json
+import mmap
 import os
+import functools
+import re
 import sys
 import time
+import pickle
 import random
 import logging
 import argparse
+import multiprocessing
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, ProcessPoolExecutor, wait
 
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
@@ -54,6 +66,9 @@ sys.path.insert(0, str(ROOT))
 from src.crawlers.vbpl_searcher import VBPLSearcher
 from src.crawlers.vbpl_status import VBPLStatusScraper
 from src.crawlers.vbpl_crawler import VBPLCrawler
+from src.crawlers.http_utils import AdaptiveDelay, HTTPCache, make_session
+from src.crawlers.storage import read_text
+from json_utils import json_line, json_loads, write_json
 from parsers import get_parser, PARSER_MAP
 
 # ──────────────────────────────────────
@@ -65,11 +80,14 @@ PARSED_DIR = OUT_DIR / "parsed"
 HTML_DIR = OUT_DIR / "raw_html"
 PDF_DIR = OUT_DIR / "pdfs"
 STATS_FILE = OUT_DIR / "discovery_stats.json"
+SO_HIEU_PICKLE = OUT_DIR / "existing_so_hieus.pkl"
 
 WEEK_CHECKPOINT = OUT_DIR / "week_checkpoint.json"
+HTTP_CACHE_DIR = OUT_DIR / "http_cache"
 
-for d in [OUT_DIR, PARSED_DIR, HTML_DIR, PDF_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
+for d in (OUT_DIR, PARSED_DIR, HTML_DIR, PDF_DIR):
+    if not d.is_dir():
+        d.mkdir(parents=True, exist_ok=True)
 
 # ──────────────────────────────────────
 # Config
@@ -79,6 +97,7 @@ JITTER_MAX = 1.0
 BACKOFF_FACTOR = 2.0
 MAX_DELAY = 60.0
 MAX_RETRIES = 3
+DEFAULT_WORKERS = 4
 
 logging.basicConfig(
     level=logging.INFO,
@@ -92,14 +111,46 @@ logger = logging.getLogger(__name__)
 # 1. Load existing so_hieu set (for filtering)
 # ──────────────────────────────────────
 
+def _iter_cached_docs(cache: Path):
+    """Yield doc dicts from the JSON-array cache one at a time.
+
+    Streams with ijson when it is installed; otherwise falls back to a
+    plain json.load of the whole file.
+    """
+    try:
+        import ijson
+    except ImportError:
+        with open(cache, encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    with open(cache, "rb") as f:
+        yield from ijson.items(f, "item")
+
+
 def load_existing_so_hieus() -> set[str]:
     """Load so_hieu from data_universal to skip already-known docs."""
     cache = ROOT / "outputs" / "enrichment" / "tax_docs_cache.json"
     if cache.exists():
-        with open(cache, encoding="utf-8") as f:
-            docs = json.load(f)
-        so_hieus = {d["so_hieu"].strip().lower() for d in docs if d.get("so_hieu")}
+        # Reuse the set built on a previous run while the cache is unchanged
+        mtime = cache.stat().st_mtime
+        if SO_HIEU_PICKLE.exists():
+            try:
+                with open(SO_HIEU_PICKLE, "rb") as f:
+                    pickled = pickle.load(f)
+                if pickled.get("mtime") == mtime:
+                    logger.info("Loaded %d existing so_hieu from %s",
+                                len(pickled["so_hieus"]), SO_HIEU_PICKLE.name)
+                    return pickled["so_hieus"]
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+
+        so_hieus = {
+            d["so_hieu"].strip().lower()
+            for d in _iter_cached_docs(cache) if d.get("so_hieu")
+        }
         logger.info("Loaded %d existing so_hieu from cache", len(so_hieus))
+        with open(SO_HIEU_PICKLE, "wb") as f:
+            pickle.dump({"mtime": mtime, "so_hieus": so_hieus}, f)
         return so_hieus
 
     # Fallback: try loading from dataset directly (slow on NTFS)
@@ -109,11 +160,12 @@ def load_existing_so_hieus() -> set[str]:
             from datasets import load_from_disk
             logger.info("Loading dataset (may be slow)...")
             ds = load_from_disk(str(dataset_path))
-            so_hieus = {
-                s.strip().lower()
-                for s in ds["train"]["so_hieu"]
-                if s and s.strip()
-            }
+            so_hieus = set()
+            column = ds["train"].select_columns(["so_hieu"])
+            for batch in column.iter(batch_size=10000):
+                so_hieus.update(
+                    s.strip().lower() for s in batch["so_hieu"] if s and s.strip()
+                )
             logger.info("Loaded %d existing so_hieu from dataset", len(so_hieus))
             return so_hieus
         except Exception as e:
@@ -127,34 +179,38 @@ def load_existing_so_hieus() -> set[str]:
 # 2. Checkpoint (resume support)
 # ──────────────────────────────────────
 
+# Records start with the "match" block, so the first vbpl_item_id on a line
+# is match.vbpl_item_id.
+_ITEM_ID_RE = re.compile(rb'"vbpl_item_id"\s*:\s*(\d+)')
+
+
 def load_checkpoint() -> set[int]:
-    """Return set of already-processed ItemIDs."""
-    done = set()
-    if JSONL_FILE.exists():
-        with open(JSONL_FILE, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    r = json.loads(line)
-                    item_id = r.get("match", {}).get("vbpl_item_id")
-                    if item_id:
-                        done.add(int(item_id))
-                except json.JSONDecodeError:
-                    pass
-    return done
+    """
+    Return set of already-processed ItemIDs.
+
+    The JSONL is memory-mapped and scanned once with the bytes regex, so
+    the search runs over the whole buffer in C instead of line by line.
+    ``vbpl_item_id`` only appears under each record's ``match``, as an
+    int or null, so no JSON parsing is needed.
+    """
+    if not JSONL_FILE.exists() or JSONL_FILE.stat().st_size == 0:
+        return set()
+    with open(JSONL_FILE, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return {int(m.group(1)) for m in _ITEM_ID_RE.finditer(mm)}
 
 
 # ──────────────────────────────────────
 # 2b. Weekly chunking utilities
 # ──────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
 def _parse_vn_date(s: str) -> datetime:
     """Parse dd/mm/yyyy → datetime."""
     return datetime.strptime(s.strip(), "%d/%m/%Y")
 
 
+@functools.lru_cache(maxsize=None)
 def _fmt_vn_date(dt: datetime) -> str:
     """Format datetime → dd/mm/yyyy."""
     return dt.strftime("%d/%m/%Y")
@@ -175,13 +231,13 @@ def generate_weekly_chunks(
     """
     start = _parse_vn_date(from_date)
     end = _parse_vn_date(to_date)
-    chunks = []
-    cursor = start
-    while cursor <= end:
-        chunk_end = min(cursor + timedelta(days=chunk_days - 1), end)
-        chunks.append((_fmt_vn_date(cursor), _fmt_vn_date(chunk_end)))
-        cursor = chunk_end + timedelta(days=1)
-    return chunks
+    n_chunks = ((end - start).days + chunk_days) // chunk_days
+    step = timedelta(days=chunk_days)
+    last = timedelta(days=chunk_days - 1)
+    return [
+        (_fmt_vn_date(start + i * step), _fmt_vn_date(min(start + i * step + last, end)))
+        for i in range(n_chunks)
+    ]
 
 
 def load_week_checkpoint() -> dict:
@@ -191,39 +247,95 @@ def load_week_checkpoint() -> dict:
              "last_run": "2026-02-08T..."}
     """
     if WEEK_CHECKPOINT.exists():
-        with open(WEEK_CHECKPOINT, encoding="utf-8") as f:
-            return json.load(f)
+        with open(WEEK_CHECKPOINT, "rb") as f:
+            return json_loads(f.read())
     return {"completed_weeks": [], "last_run": None}
 
 
 def save_week_checkpoint(ckpt: dict):
-    """Persist week checkpoint to disk."""
+    """Persist week checkpoint to disk atomically (temp file + rename)."""
     ckpt["last_run"] = datetime.now().isoformat()
-    with open(WEEK_CHECKPOINT, "w", encoding="utf-8") as f:
-        json.dump(ckpt, f, ensure_ascii=False, indent=2)
+    tmp_path = WEEK_CHECKPOINT.with_suffix(".tmp")
+    write_json(tmp_path, ckpt)
+    os.replace(tmp_path, WEEK_CHECKPOINT)
 
 
 # ──────────────────────────────────────
 # 3. Main pipeline
 # ──────────────────────────────────────
 
+# Title-based doc type detection: one alternation, longest key first so
+# "Thông tư liên tịch" wins over "Thông tư" at the same position. Among the
+# types a title mentions, the one earliest in PARSER_MAP wins (see
+# _doctype_from_title), not the leftmost.
+_DOCTYPE_KEYS = sorted(PARSER_MAP, key=len, reverse=True)
+_DOCTYPE_RE = re.compile("|".join(re.escape(k) for k in _DOCTYPE_KEYS), re.IGNORECASE)
+# lowercased key -> (PARSER_MAP position, key)
+_DOCTYPE_BY_LOWER = {k.lower(): (i, k) for i, k in enumerate(PARSER_MAP)}
+# "/", "\\" and " " → "_" for output filenames
+_SAFE_NAME_TABLE = str.maketrans({"/": "_", "\\": "_", " ": "_"})
+
+
+def _doctype_from_title(title: str) -> str | None:
+    """PARSER_MAP key named in *title*; the earliest in PARSER_MAP if several."""
+    hits = [_DOCTYPE_BY_LOWER[m.group(0).lower()] for m in _DOCTYPE_RE.finditer(title)]
+    return min(hits)[1] if hits else None
+
+
+def _parse_document(
+    html_path: str, title: str, loai_vb: str, parsed_path: str, pretty: bool = False,
+) -> dict:
+    """
+    Parse the saved toàn văn HTML and save the JSON tree to *parsed_path*.
+
+    Top-level so it can run inside a ProcessPoolExecutor worker: parsing is
+    CPU-bound, so it is kept off the network threads. Takes a path rather
+    than the HTML string so multi-MB documents are not pickled across
+    processes. The JSON tree is written compactly unless *pretty* is set.
+    Returns the ``parsed`` summary for the JSONL record.
+    """
+    html = read_text(html_path)
+    parser = get_parser(loai_vb)
+    parsed = parser.parse(html, title=title)
+    del html
+
+    write_json(parsed_path, parsed, pretty=pretty)
+
+    total_nodes, node_types = _count_stats(parsed.get("structure") or {})
+    return {
+        "parser": parser.__class__.__name__,
+        "doc_type": loai_vb,
+        "total_nodes": total_nodes,
+        "node_types": node_types,
+        "parsed_file": parsed_path,
+    }
+
+
 def process_one_document(
     match,
     scraper: VBPLStatusScraper,
     crawler: VBPLCrawler,
-    current_delay: float,
-) -> tuple[dict, float]:
+    delay: AdaptiveDelay,
+    parse_pool: ProcessPoolExecutor | None = None,
+    pretty: bool = False,
+    compress_html: bool = False,
+) -> tuple[dict, Future | None]:
     """
     Full pipeline for a single document:
       enrich → crawl toàn văn → parse → save files.
 
-    Returns (record_dict, updated_delay).
+    If *parse_pool* is given, the parse step is dispatched to it instead of
+    running in the calling thread, and its future is returned for the caller
+    to hand to ``_finish_parse``; the calling thread is free for the next
+    download meanwhile. *delay* backs off or recovers with the outcome.
+
+    Returns (record_dict, parse_future or None).
     """
     item_id = match.vbpl_item_id
     so_hieu = match.so_hieu or f"ItemID_{item_id}"
     path_seg = match.path_segment or "TW"
 
-    safe_name = so_hieu.replace("/", "_").replace("\\", "_").replace(" ", "_")
+    safe_name = so_hieu.translate(_SAFE_NAME_TABLE)
 
     record = {
         "match": match.to_dict(),
@@ -247,27 +359,26 @@ def process_one_document(
         logger.warning("  ✗ Enrich failed: %s", e)
         record["error"] = f"enrich: {e}"
 
-    time.sleep(current_delay + random.uniform(0, JITTER_MAX))
+    # Crawler/scraper already space their own requests; only add jitter here
+    time.sleep(random.uniform(0, JITTER_MAX))
 
     # ── Step B: Crawl toàn văn ──
     toanvan = None
     try:
-        toanvan = crawler.crawl_toanvan(item_id, path_seg)
+        # Raw HTML is written straight to disk by the crawler
+        html_path = HTML_DIR / f"{safe_name}{'.html.zst' if compress_html else '.html'}"
+        toanvan = crawler.crawl_toanvan(item_id, path_seg, html_path=str(html_path))
         record["toanvan"] = {
             "source": toanvan["source"],
             "content_text_len": len(toanvan.get("content_text") or ""),
-            "content_html_len": len(toanvan.get("content_html") or ""),
+            "content_html_len": toanvan.get("content_html_len", 0),
             "pdf_url": toanvan.get("pdf_url"),
             "pdf_filename": toanvan.get("pdf_filename"),
         }
 
-        # Save raw HTML
-        if toanvan.get("content_html"):
-            html_path = HTML_DIR / f"{safe_name}.html"
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(toanvan["content_html"])
+        if toanvan.get("content_html_path"):
             logger.info("  ✓ HTML saved: %d chars → %s",
-                         len(toanvan["content_html"]), html_path.name)
+                         toanvan["content_html_len"], html_path.name)
 
         # Download PDF if available
         if toanvan.get("pdf_url"):
@@ -285,149 +396,214 @@ def process_one_document(
         else:
             record["error"] = f"crawl: {e}"
 
-    time.sleep(current_delay + random.uniform(0, JITTER_MAX))
-
     # ── Step C: Parse (if HTML content available) ──
-    if toanvan and toanvan.get("content_html"):
-        try:
-            # Determine doc type for parser selection
-            loai_vb = "Luật"  # default
-            if record.get("validity"):
-                loai_vb = record["validity"].get("loai_van_ban", "Luật") or "Luật"
-            # Also try from matched title
-            if not loai_vb or loai_vb == "Luật":
-                title = match.matched_title or ""
-                for doc_type in PARSER_MAP:
-                    if doc_type.lower() in title.lower():
-                        loai_vb = doc_type
-                        break
-
-            parser = get_parser(loai_vb)
-            title = match.matched_title or so_hieu
-            parsed = parser.parse(toanvan["content_html"], title=title)
-
-            # Save parsed JSON
-            parsed_path = PARSED_DIR / f"{safe_name}.json"
-            with open(parsed_path, "w", encoding="utf-8") as f:
-                json.dump(parsed, f, ensure_ascii=False, indent=2)
-
-            # Summary for JSONL
-            structure = parsed.get("structure", {})
-            record["parsed"] = {
-                "parser": parser.__class__.__name__,
-                "doc_type": loai_vb,
-                "total_nodes": _count_nodes(structure),
-                "node_types": _count_by_type(structure),
-                "parsed_file": str(parsed_path),
-            }
-
-            logger.info("  ✓ Parsed with %s: %d nodes → %s",
-                         parser.__class__.__name__,
-                         record["parsed"]["total_nodes"],
-                         parsed_path.name)
-
-        except Exception as e:
-            logger.warning("  ✗ Parse failed: %s", e)
-            if record["error"]:
-                record["error"] += f"; parse: {e}"
-            else:
-                record["error"] = f"parse: {e}"
+    parse_future = None
+    if toanvan and toanvan.get("content_html_path"):
+        # Determine doc type for parser selection
+        loai_vb = "Luật"  # default
+        if record.get("validity"):
+            loai_vb = record["validity"].get("loai_van_ban", "Luật") or "Luật"
+        # Also try from matched title
+        if not loai_vb or loai_vb == "Luật":
+            loai_vb = _doctype_from_title(match.matched_title or "") or loai_vb
+
+        title = match.matched_title or so_hieu
+        parsed_path = PARSED_DIR / f"{safe_name}.json"
+        parse_args = (toanvan["content_html_path"], title, loai_vb, str(parsed_path), pretty)
+        if parse_pool is not None:
+            parse_future = parse_pool.submit(_parse_document, *parse_args)
+        else:
+            _finish_parse(record, lambda: _parse_document(*parse_args))
 
-    # Adaptive delay
+    # Adaptive delay (a dispatched parse is not waited for: the delay paces
+    # vbpl.vn, and parse failures are local)
     if record["error"]:
-        current_delay = min(current_delay * BACKOFF_FACTOR, MAX_DELAY)
+        delay.backoff()
     else:
-        current_delay = max(BASE_DELAY, current_delay * 0.85)
+        delay.recover(0.85)
 
-    return record, current_delay
+    return record, parse_future
 
 
-def _count_nodes(node: dict) -> int:
-    total = 1
-    for child in node.get("children", []):
-        total += _count_nodes(child)
-    return total
+def _finish_parse(record: dict, get_parsed) -> None:
+    """
+    Store ``get_parsed()`` (the ``_parse_document`` summary, or a parse
+    future's ``result``) as ``record["parsed"]``; failures go to
+    ``record["error"]``.
+    """
+    try:
+        record["parsed"] = get_parsed()
+        logger.info("  ✓ Parsed with %s: %d nodes → %s",
+                     record["parsed"]["parser"],
+                     record["parsed"]["total_nodes"],
+                     Path(record["parsed"]["parsed_file"]).name)
+    except Exception as e:
+        logger.warning("  ✗ Parse failed: %s", e)
+        if record["error"]:
+            record["error"] += f"; parse: {e}"
+        else:
+            record["error"] = f"parse: {e}"
+
 
+def _iter_node_types(root: dict):
+    """Yield the type of every node in a parsed tree (iterative walk)."""
+    stack = [root]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        node = pop()
+        yield node.get("type", "?")
+        extend(node.get("children") or ())
 
-def _count_by_type(node: dict) -> dict:
-    counts: dict[str, int] = {}
-    _count_by_type_recursive(node, counts)
-    return counts
 
+def _count_stats(root: dict) -> tuple[int, dict]:
+    """
+    Count nodes in a parsed tree, in total and per node type.
 
-def _count_by_type_recursive(node: dict, counts: dict):
-    t = node.get("type", "?")
-    counts[t] = counts.get(t, 0) + 1
-    for child in node.get("children", []):
-        _count_by_type_recursive(child, counts)
+    Single iterative walk (no recursion limit on deep Phần→…→Điểm trees);
+    Counter consumes the generator in C.
+    """
+    counts = Counter(_iter_node_types(root))
+    return sum(counts.values()), dict(counts)
 
 
 # ──────────────────────────────────────
 # 4. Discovery mode (browse by date range)
 # ──────────────────────────────────────
 
+def _process_with_retries(
+    match,
+    scraper: VBPLStatusScraper,
+    crawler: VBPLCrawler,
+    delay: AdaptiveDelay,
+    parse_pool: ProcessPoolExecutor | None = None,
+    pretty: bool = False,
+    compress_html: bool = False,
+) -> tuple[dict, Future | None]:
+    """Run process_one_document with retries, then pause before the next doc."""
+    so_hieu = match.so_hieu or f"ID_{match.vbpl_item_id}"
+    logger.info("── Processing: %s (ItemID=%s) ──", so_hieu, match.vbpl_item_id)
+
+    parse_future = None
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            record, parse_future = process_one_document(
+                match, scraper, crawler, delay,
+                parse_pool=parse_pool, pretty=pretty, compress_html=compress_html,
+            )
+            break
+        except Exception as e:
+            logger.warning("  Attempt %d/%d failed: %s", attempt, MAX_RETRIES, e)
+            delay.backoff()
+            if attempt < MAX_RETRIES:
+                delay.sleep()
+            else:
+                record = {
+                    "match": match.to_dict(),
+                    "error": f"all retries failed: {e}",
+                    "processed_at": datetime.now().isoformat(),
+                }
+
+    delay.sleep()
+    return record, parse_future
+
+
+def _record_stats(record: dict, stats: Counter):
+    """Update per-week counters from one finished record."""
+    if record.get("error"):
+        stats["error"] += 1
+    else:
+        stats["success"] += 1
+    if (record.get("toanvan") or {}).get("source") == "html":
+        stats["html"] += 1
+    elif (record.get("toanvan") or {}).get("source") == "pdf":
+        stats["pdf"] += 1
+    if record.get("parsed"):
+        stats["parsed"] += 1
+
+
 def _process_matches(
     matches: list,
     scraper: VBPLStatusScraper,
     crawler: VBPLCrawler,
     stats: Counter,
-    current_delay: float,
+    delay: AdaptiveDelay,
+    jsonl_fp,
     limit: int = 0,
-) -> float:
-    """Process a list of matches (shared by both weekly and flat mode)."""
+    workers: int = 1,
+    pretty: bool = False,
+    compress_html: bool = False,
+) -> None:
+    """
+    Process a list of matches (shared by both weekly and flat mode).
+
+    With ``workers > 1`` the network steps (enrich + crawl) run in a thread
+    pool and parsing is dispatched to a process pool. The crawlers' own
+    rate limiter still spaces out requests to vbpl.vn, and every worker
+    pauses on the shared *delay*. Records are written to *jsonl_fp* (kept
+    open by the caller) only from this (main) thread, once both steps of a
+    document have completed.
+    """
     from tqdm import tqdm
 
     if limit and limit > 0:
         matches = matches[:limit]
 
     if not matches:
-        return current_delay
-
-    pbar = tqdm(matches, desc="Processing", unit="doc", leave=False)
-    for match in pbar:
-        so_hieu = match.so_hieu or f"ID_{match.vbpl_item_id}"
-        pbar.set_postfix_str(f"{so_hieu[:25]} d={current_delay:.1f}")
+        return
 
-        logger.info("── Processing: %s (ItemID=%s) ──", so_hieu, match.vbpl_item_id)
+    def write_record(record: dict):
+        jsonl_fp.write(json_line(record))
+        _record_stats(record, stats)
+
+    if workers <= 1:
+        pbar = tqdm(matches, desc="Processing", unit="doc", leave=False)
+        for match in pbar:
+            so_hieu = match.so_hieu or f"ID_{match.vbpl_item_id}"
+            pbar.set_postfix_str(f"{so_hieu[:25]} d={delay.value:.1f}")
+            record, _ = _process_with_retries(
+                match, scraper, crawler, delay,
+                pretty=pretty, compress_html=compress_html,
+            )
+            write_record(record)
+        pbar.close()
+        return
 
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                record, current_delay = process_one_document(
-                    match, scraper, crawler, current_delay
-                )
-                break
-            except Exception as e:
-                logger.warning("  Attempt %d/%d failed: %s", attempt, MAX_RETRIES, e)
-                current_delay = min(current_delay * BACKOFF_FACTOR, MAX_DELAY)
-                if attempt < MAX_RETRIES:
-                    time.sleep(current_delay + random.uniform(0, JITTER_MAX))
+    n_parsers = max(1, min(workers, (os.cpu_count() or 2) - 1))
+    # Parse workers are started lazily by the first submit, which happens on
+    # a net_pool thread; a plain fork() then could copy locks (logging,
+    # urllib3's pool) held by the other threads into the child. forkserver
+    # forks from a clean single-threaded server instead.
+    mp_context = multiprocessing.get_context(
+        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+    )
+    pbar = tqdm(total=len(matches), desc="Processing", unit="doc", leave=False)
+    with ProcessPoolExecutor(max_workers=n_parsers, mp_context=mp_context) as parse_pool, \
+            ThreadPoolExecutor(max_workers=workers) as net_pool:
+        # future -> (match, record); record is None while the network step runs
+        pending = {
+            net_pool.submit(
+                _process_with_retries, match, scraper, crawler, delay,
+                parse_pool, pretty, compress_html,
+            ): (match, None)
+            for match in matches
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                match, record = pending.pop(fut)
+                if record is None:
+                    record, parse_future = fut.result()
+                    if parse_future is not None:
+                        pending[parse_future] = (match, record)
+                        continue
                 else:
-                    record = {
-                        "match": match.to_dict(),
-                        "error": f"all retries failed: {e}",
-                        "processed_at": datetime.now().isoformat(),
-                    }
-
-        # Write to JSONL
-        with open(JSONL_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-        # Stats
-        if record.get("error"):
-            stats["error"] += 1
-        else:
-            stats["success"] += 1
-        if record.get("toanvan", {}).get("source") == "html":
-            stats["html"] += 1
-        elif record.get("toanvan", {}).get("source") == "pdf":
-            stats["pdf"] += 1
-        if record.get("parsed"):
-            stats["parsed"] += 1
-
-        time.sleep(current_delay + random.uniform(0, JITTER_MAX))
-
+                    _finish_parse(record, fut.result)
+                write_record(record)
+                pbar.set_postfix_str(
+                    f"{(match.so_hieu or str(match.vbpl_item_id))[:25]} d={delay.value:.1f}"
+                )
+                pbar.update(1)
     pbar.close()
-    return current_delay
 
 
 def run_discover(args):
@@ -452,9 +628,9 @@ def run_discover(args):
     logger.info("=" * 60)
 
     # Load existing DB for filtering
-    existing = set()
+    existing: frozenset[str] = frozenset()
     if not args.skip_filter:
-        existing = load_existing_so_hieus()
+        existing = frozenset(load_existing_so_hieus())
 
     # Load checkpoints
     done_ids = load_checkpoint()
@@ -481,9 +657,14 @@ def run_discover(args):
         return
 
     # Shared resources
-    crawler = VBPLCrawler(delay=BASE_DELAY)
-    scraper = VBPLStatusScraper(delay=BASE_DELAY)
-    current_delay = BASE_DELAY
+    # One pooled keep-alive session shared by the crawler and the scraper
+    session = make_session()
+    cache = HTTPCache(HTTP_CACHE_DIR, refresh=args.no_cache)
+    crawler = VBPLCrawler(delay=BASE_DELAY, session=session, cache=cache)
+    # --fresh also refetches status pages: validity must not come from a past run
+    status_cache = HTTPCache(HTTP_CACHE_DIR, refresh=args.no_cache or args.fresh)
+    scraper = VBPLStatusScraper(delay=BASE_DELAY, session=session, cache=status_cache)
+    delay = AdaptiveDelay(BASE_DELAY, MAX_DELAY, factor=BACKOFF_FACTOR, jitter=JITTER_MAX)
     total_stats = Counter()
     total_new = 0
     global_limit_remaining = args.limit if args.limit > 0 else None
@@ -507,19 +688,17 @@ def run_discover(args):
         except Exception as e:
             logger.error("  ✗ Discovery failed for week %s→%s: %s", w_start, w_end, e)
             total_stats["week_errors"] += 1
-            time.sleep(current_delay * 2)
+            time.sleep(delay.value * 2)
             continue
 
         logger.info("  Found %d documents in this period", len(matches))
 
-        # Filter
-        new_matches = []
-        for m in matches:
-            if m.vbpl_item_id in done_ids:
-                continue
-            if not args.skip_filter and m.so_hieu and m.so_hieu.strip().lower() in existing:
-                continue
-            new_matches.append(m)
+        # Filter (skip_filter leaves `existing` empty, so the lookup is a no-op)
+        new_matches = [
+            m for m in matches
+            if m.vbpl_item_id not in done_ids
+            and not (m.so_hieu and m.so_hieu.strip().lower() in existing)
+        ]
 
         skipped = len(matches) - len(new_matches)
         if skipped:
@@ -533,9 +712,13 @@ def run_discover(args):
 
         if new_matches:
             week_stats = Counter()
-            current_delay = _process_matches(
-                new_matches, scraper, crawler, week_stats, current_delay,
-            )
+            # One buffered handle per week; closed (flushed) before checkpointing
+            with open(JSONL_FILE, "a", encoding="utf-8", buffering=1 << 16) as jsonl_fp:
+                _process_matches(
+                    new_matches, scraper, crawler, week_stats, delay,
+                    jsonl_fp, workers=args.workers, pretty=args.pretty,
+                    compress_html=args.compress_html,
+                )
             total_stats.update(week_stats)
             total_new += len(new_matches)
 
@@ -549,11 +732,12 @@ def run_discover(args):
         else:
             logger.info("  Nothing new in this period.")
 
-        # Mark week as completed
-        completed_weeks.add(week_key)
-        week_ckpt["completed_weeks"] = sorted(completed_weeks)
-        save_week_checkpoint(week_ckpt)
-        logger.info("  ✓ Week checkpoint saved.")
+        # Mark week as completed (only rewrite the checkpoint if it changed)
+        if week_key not in completed_weeks:
+            completed_weeks.add(week_key)
+            week_ckpt["completed_weeks"] = sorted(completed_weeks)
+            save_week_checkpoint(week_ckpt)
+            logger.info("  ✓ Week checkpoint saved.")
 
         # Check global limit
         if global_limit_remaining is not None and global_limit_remaining <= 0:
@@ -582,9 +766,13 @@ def run_single(args):
     logger.info("SINGLE DOCUMENT MODE: %s", so_hieu)
     logger.info("=" * 60)
 
-    searcher = VBPLSearcher(delay=BASE_DELAY)
-    scraper = VBPLStatusScraper(delay=BASE_DELAY)
-    crawler = VBPLCrawler(delay=BASE_DELAY)
+    session = make_session()
+    cache = HTTPCache(HTTP_CACHE_DIR, refresh=args.no_cache)
+    searcher = VBPLSearcher(delay=BASE_DELAY, session=session)
+    # Always refetch status pages so the reported validity is current
+    status_cache = HTTPCache(HTTP_CACHE_DIR, refresh=True)
+    scraper = VBPLStatusScraper(delay=BASE_DELAY, session=session, cache=status_cache)
+    crawler = VBPLCrawler(delay=BASE_DELAY, session=session, cache=cache)
 
     # Search
     match = searcher.search(so_hieu)
@@ -599,11 +787,14 @@ def run_single(args):
     time.sleep(BASE_DELAY + random.uniform(0, JITTER_MAX))
 
     # Full pipeline
-    record, _ = process_one_document(match, scraper, crawler, BASE_DELAY)
+    record, _ = process_one_document(
+        match, scraper, crawler, AdaptiveDelay(BASE_DELAY, MAX_DELAY, factor=BACKOFF_FACTOR),
+        pretty=args.pretty, compress_html=args.compress_html,
+    )
 
     # Write to JSONL
     with open(JSONL_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(json_line(record))
 
     # Pretty print summary
     print("\n" + "=" * 60)
@@ -653,42 +844,53 @@ def show_stats():
         print("No output file found.")
         return
 
-    records = []
-    with open(JSONL_FILE, encoding="utf-8") as f:
+    total = errors = with_validity = with_toanvan = with_parsed = 0
+    source_dist = Counter()
+    status_dist = Counter()
+    parser_dist = Counter()
+    confidence_dist = Counter()
+    loads = json_loads
+
+    with open(JSONL_FILE, "rb") as f:
         for line in f:
-            if line.strip():
-                try:
-                    records.append(json.loads(line))
-                except json.JSONDecodeError:
-                    pass
+            if not line.strip():
+                continue
+            try:
+                r = loads(line)
+            except ValueError:
+                continue
+
+            total += 1
+            if r.get("error"):
+                errors += 1
+
+            validity = r.get("validity")
+            if validity:
+                with_validity += 1
+                status_dist[validity.get("status_current", "unknown")] += 1
+            else:
+                status_dist["no_data"] += 1
+
+            toanvan = r.get("toanvan")
+            if toanvan:
+                with_toanvan += 1
+                source_dist[toanvan.get("source", "none")] += 1
+            else:
+                source_dist["none"] += 1
+
+            parsed = r.get("parsed")
+            if parsed:
+                with_parsed += 1
+                parser_dist[parsed.get("parser", "?")] += 1
+            else:
+                parser_dist["none"] += 1
+
+            confidence_dist[(r.get("match") or {}).get("confidence", "?")] += 1
 
-    total = len(records)
     if not total:
         print("No records found.")
         return
 
-    errors = sum(1 for r in records if r.get("error"))
-    with_validity = sum(1 for r in records if r.get("validity"))
-    with_toanvan = sum(1 for r in records if r.get("toanvan"))
-    with_parsed = sum(1 for r in records if r.get("parsed"))
-
-    source_dist = Counter(
-        r.get("toanvan", {}).get("source", "none") if r.get("toanvan") else "none"
-        for r in records
-    )
-    status_dist = Counter(
-        r.get("validity", {}).get("status_current", "unknown") if r.get("validity") else "no_data"
-        for r in records
-    )
-    parser_dist = Counter(
-        r.get("parsed", {}).get("parser", "?") if r.get("parsed") else "none"
-        for r in records
-    )
-    confidence_dist = Counter(
-        r.get("match", {}).get("confidence", "?")
-        for r in records
-    )
-
     print("\n" + "=" * 60)
     print("📊 DISCOVERY PIPELINE STATISTICS")
     print("=" * 60)
@@ -739,9 +941,15 @@ Examples:
   # Start fresh (clear all checkpoints)
   python3 discover_new_documents.py --from-date 01/01/2024 --fresh
 
+  # Also refetch pages stored in the HTTP cache
+  python3 discover_new_documents.py --from-date 01/01/2024 --fresh --no-cache
+
   # Process a single known document
   python3 discover_new_documents.py --so-hieu "100/2024/ND-CP"
 
+  # Process up to 8 documents concurrently
+  python3 discover_new_documents.py --from-date 01/01/2025 --workers 8
+
   # Show stats from previous runs
   python3 discover_new_documents.py --stats
 
@@ -766,10 +974,18 @@ Examples:
                         help="Max TOTAL documents to process across all weeks")
     parser.add_argument("--max-pages", type=int, default=100,
                         help="Max browse pages per week (50 docs/page)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Documents processed concurrently (default: {DEFAULT_WORKERS}, 1 = sequential)")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent the parsed JSON files (default: compact)")
+    parser.add_argument("--compress-html", action="store_true",
+                        help="Store raw toàn văn HTML as zstd .html.zst (needs zstandard)")
     parser.add_argument("--skip-filter", action="store_true",
                         help="Skip filtering against existing database")
     parser.add_argument("--fresh", action="store_true",
-                        help="Clear week checkpoint and start over")
+                        help="Clear week checkpoint and start over (also refetches thuộc tính/lịch sử pages)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached thuộc tính/lịch sử/toàn văn pages and refetch them")
     parser.add_argument("--stats", action="store_true",
                         help="Show statistics from previous runs")
 
@@ -779,6 +995,12 @@ Examples:
         show_stats()
         return
 
+    if args.compress_html:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            parser.error("--compress-html requires zstandard (pip install zstandard)")
+
     if args.fresh:
         if WEEK_CHECKPOINT.exists():
             WEEK_CHECKPOINT.unlink()
@@ -16,19 +16,39 @@ Target: 300-400 questions from ~70 diverse documents (stratified by loai_van_ban
 Usage:
     python3 generate_groundtruth.py                  # generate ~350 questions (default)
     python3 generate_groundtruth.py --target 400     # aim for 400 questions
-    python3 generate_groundtruth.py --all            # ALL docs (50k+ questions)
+    python3 generate_groundtruth.py --all            # ALL docs (50k+ questions) → test_groundtruth.jsonl
     python3 generate_groundtruth.py --stats           # just show stats (dry run)
 """
 
-import json
-import glob
+import heapq
+import os
 import random
 import re
 import sys
 import logging
 from pathlib import Path
-from collections import Counter, defaultdict
-from typing import Optional
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterator, Optional
+
+from json_utils import json_line, read_json, write_json
+
+try:
+    import numpy as np  # optional: vectorized quality scoring for sampling
+except ImportError:
+    np = None
+
+try:
+    import numba  # optional: JIT scoring kernel for very large corpora
+except ImportError:
+    numba = None
+
+try:
+    import ahocorasick  # optional: pyahocorasick, one-pass keyword scan
+except ImportError:
+    ahocorasick = None
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
 logger = logging.getLogger(__name__)
@@ -39,56 +59,82 @@ OUTPUT_FILE = ROOT / "test_groundtruth.json"
 
 random.seed(42)  # reproducible
 
+# "Điều 7", "Điều 12a" at the start of an article title
+_DIEU_RE = re.compile(r"Điều\s+(\d+[\w]*)")
+# A number followed by a unit (percent, money, duration, area, count)
+_NUM_HAS_RE = re.compile(r'\d+[%,.]?\d*\s*(%|triệu|đồng|ngày|tháng|năm|m²|lần)')
+_NUM_FIND_RE = re.compile(r'(\d+[.,]?\d*\s*(?:%|triệu|đồng|ngày|tháng|năm|m²|lần|giờ|phút))')
+
 # ─────────────────────────────────────────────────
 # 1. EXTRACT articles/clauses from parsed structure
 # ─────────────────────────────────────────────────
 
+# Child items listed in a factual-list answer (the rest are only counted)
+MAX_LISTED_CHILDREN = 15
+
 def extract_articles(node: dict, doc_title: str = "", depth: int = 0) -> list[dict]:
-    """Recursively extract articles and substantive clauses from parsed structure."""
+    """Extract articles and substantive clauses from parsed structure.
+
+    Iterative pre-order DFS over an explicit stack, so deep trees cost no
+    Python frames and cannot hit the recursion limit. Results come out in
+    the same document order as a recursive walk.
+    """
     results = []
-    ntype = node.get("type", "")
-    title = (node.get("title") or "").strip()
-    content = (node.get("content") or "").strip()
-    children = node.get("children", [])
-
-    # Collect child content for articles that have children but no/short own content
-    children_text = ""
-    child_items = []
-    for ch in children:
-        ch_title = (ch.get("title") or "").strip()
-        ch_content = (ch.get("content") or "").strip()
-        ch_type = ch.get("type", "")
-        piece = f"{ch_title}: {ch_content}" if ch_content else ch_title
-        if piece and len(piece) > 10:
-            child_items.append({"type": ch_type, "title": ch_title, "content": ch_content})
-        if ch_content:
-            children_text += " " + ch_content
-
-    full_content = (content + " " + children_text).strip()
-
-    if ntype == "article" and len(full_content) > 60:
-        results.append({
-            "type": "article",
-            "title": title,
-            "content": content,
-            "full_content": full_content[:3000],  # cap for sanity
-            "children": child_items[:20],
-            "num_children": len(child_items),
-        })
-
-    # Also extract standalone substantive clauses (only if not under a collected article)
-    if ntype == "clause" and content and len(content) > 80 and depth >= 2:
-        results.append({
-            "type": "clause",
-            "title": title,
-            "content": content[:2000],
-            "full_content": content[:2000],
-            "children": [],
-            "num_children": 0,
-        })
-
-    for ch in children:
-        results.extend(extract_articles(ch, doc_title, depth + 1))
+    stack = [(node, depth)]
+    while stack:
+        node, depth = stack.pop()
+        ntype = node.get("type", "")
+        title = (node.get("title") or "").strip()
+        content = (node.get("content") or "").strip()
+        children = node.get("children", [])
+
+        # Collect child content for articles that have children but no/short own content.
+        # Only the first MAX_LISTED_CHILDREN items are kept, already cleaned and
+        # trimmed to what gen_factual_list shows; the rest are just counted.
+        parts = []
+        num_children = 0
+        child_titles = []
+        child_contents = []
+        for ch in children:
+            ch_title = (ch.get("title") or "").strip()
+            ch_content = (ch.get("content") or "").strip()
+            piece = f"{ch_title}: {ch_content}" if ch_content else ch_title
+            if piece and len(piece) > 10:
+                if num_children < MAX_LISTED_CHILDREN:
+                    child_titles.append(_clean(ch_title, 100))
+                    child_contents.append(_clean(ch_content, 150) if ch_content else "")
+                num_children += 1
+            if ch_content:
+                parts.append(ch_content)
+
+        children_text = " " + " ".join(parts) if parts else ""
+        full_content = (content + " " + children_text).strip()
+
+        if ntype == "article" and len(full_content) > 60:
+            results.append({
+                "type": "article",
+                "title": title,
+                "content": content,
+                "full_content": full_content[:3000],  # cap for sanity
+                "child_titles": child_titles,
+                "child_contents": child_contents,
+                "num_children": num_children,
+            })
+
+        # Also extract standalone substantive clauses (only if not under a collected article)
+        if ntype == "clause" and content and len(content) > 80 and depth >= 2:
+            results.append({
+                "type": "clause",
+                "title": title,
+                "content": content[:2000],
+                "full_content": content[:2000],
+                "child_titles": [],
+                "child_contents": [],
+                "num_children": 0,
+            })
+
+        # Reversed so the first child is popped (visited) first
+        stack.extend((ch, depth + 1) for ch in reversed(children))
 
     return results
 
@@ -96,9 +142,8 @@ def extract_articles(node: dict, doc_title: str = "", depth: int = 0) -> list[di
 def load_document(filepath: str) -> Optional[dict]:
     """Load a parsed JSON document and extract key info."""
     try:
-        with open(filepath, encoding="utf-8") as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, OSError):
+        data = read_json(filepath)
+    except (ValueError, OSError):
         return None
 
     di = data.get("document_info", {})
@@ -113,6 +158,9 @@ def load_document(filepath: str) -> Optional[dict]:
     if not article_nodes:
         return None
 
+    for a in article_nodes:
+        _enrich_article(a)
+
     return {
         "filepath": filepath,
         "title": di.get("title", ""),
@@ -126,6 +174,37 @@ def load_document(filepath: str) -> Optional[dict]:
     }
 
 
+def _enrich_article(art: dict) -> dict:
+    """Precompute per-article values that several generators reuse.
+
+    Underscore keys are internal; they never end up in generated questions.
+    """
+    art["_dieu"] = _extract_dieu_number(art["title"])
+    art["_has_numbers"] = _has_numbers(art["full_content"])
+    art["_clean_800"] = _clean(art["full_content"], 800)
+    art["_content_lower"] = art["full_content"].lower()
+    return art
+
+
+# Low-cardinality metadata: a handful of distinct values across 50k+ docs
+_INTERNED_FIELDS = ("loai_van_ban", "tinh_trang", "noi_ban_hanh")
+
+
+def _intern_doc(doc: dict) -> dict:
+    """Share one string object per distinct low-cardinality value.
+
+    Applied in the parent process: strings unpickled from pool workers are
+    fresh objects per document, so interning inside the worker would not
+    carry over.
+    """
+    for k in _INTERNED_FIELDS:
+        if isinstance(doc[k], str):
+            doc[k] = sys.intern(doc[k])
+    for a in doc["articles"]:
+        a["type"] = sys.intern(a["type"])
+    return doc
+
+
 # ─────────────────────────────────────────────────
 # 2. QUESTION GENERATION TEMPLATES
 # ─────────────────────────────────────────────────
@@ -147,7 +226,7 @@ def _clean(text: str, max_len: int = 500) -> str:
 
 def _extract_dieu_number(title: str) -> str:
     """Extract article number from title like 'Điều 7. Thuế suất'."""
-    m = re.match(r"Điều\s+(\d+[\w]*)", title)
+    m = _DIEU_RE.match(title)
     return m.group(0) if m else title[:40]
 
 
@@ -158,31 +237,30 @@ def _has_list_content(article: dict) -> bool:
 
 def _has_numbers(content: str) -> bool:
     """Check if content has specific numbers (percentages, amounts, dates)."""
-    return bool(re.search(r'\d+[%,.]?\d*\s*(%|triệu|đồng|ngày|tháng|năm|m²|lần)', content))
+    return bool(_NUM_HAS_RE.search(content))
 
 
 # ── FACTUAL GENERATORS ──
 
 def gen_factual_content(doc: dict, article: dict) -> Optional[dict]:
     """Generate a factual question about the content of an article."""
-    dieu = _extract_dieu_number(article["title"])
-    content = _clean(article["full_content"], 800)
+    dieu = article["_dieu"]
+    content = article["_clean_800"]
 
     if len(content) < 60:
         return None
 
     so_hieu = doc["so_hieu"]
-    loai = doc["loai_van_ban"]
-
-    query = f"Theo {dieu} {loai} {so_hieu}, nội dung quy định cụ thể là gì?"
+    title = doc["title"]
+    ref = f"{dieu} {doc['loai_van_ban']} {so_hieu}"
 
     return {
         "type": "factual",
         "source_doc": so_hieu,
-        "source_title": doc["title"],
+        "source_title": title,
         "article_ref": article["title"],
-        "query": query,
-        "expected_answer": f"Theo {dieu} {loai} {so_hieu} ({doc['title']}): {content}",
+        "query": f"Theo {ref}, nội dung quy định cụ thể là gì?",
+        "expected_answer": f"Theo {ref} ({title}): {content}",
     }
 
 
@@ -191,17 +269,17 @@ def gen_factual_list(doc: dict, article: dict) -> Optional[dict]:
     if not _has_list_content(article):
         return None
 
-    dieu = _extract_dieu_number(article["title"])
+    dieu = article["_dieu"]
     so_hieu = doc["so_hieu"]
-    loai = doc["loai_van_ban"]
+    ref = f"{dieu} {doc['loai_van_ban']} {so_hieu}"
     n = article["num_children"]
 
     child_summary = "; ".join(
-        f"({i+1}) {_clean(ch['title'], 100)}" + (f": {_clean(ch['content'], 150)}" if ch['content'] else "")
-        for i, ch in enumerate(article["children"][:15])
+        f"({i+1}) {title}" + (f": {content}" if content else "")
+        for i, (title, content) in enumerate(zip(article["child_titles"], article["child_contents"]))
     )
 
-    query = f"{dieu} {loai} {so_hieu} liệt kê bao nhiêu trường hợp/khoản và nội dung cụ thể là gì?"
+    query = f"{ref} liệt kê bao nhiêu trường hợp/khoản và nội dung cụ thể là gì?"
 
     return {
         "type": "factual",
@@ -215,20 +293,18 @@ def gen_factual_list(doc: dict, article: dict) -> Optional[dict]:
 
 def gen_factual_number(doc: dict, article: dict) -> Optional[dict]:
     """Generate a factual question about specific numbers in an article."""
-    content = article["full_content"]
-    if not _has_numbers(content):
+    if not article["_has_numbers"]:
         return None
 
-    dieu = _extract_dieu_number(article["title"])
+    content = article["full_content"]
+    dieu = article["_dieu"]
     so_hieu = doc["so_hieu"]
-    loai = doc["loai_van_ban"]
 
-    # Find the specific numbers
-    numbers = re.findall(r'(\d+[.,]?\d*\s*(?:%|triệu|đồng|ngày|tháng|năm|m²|lần|giờ|phút))', content)
-    if not numbers:
+    # Need at least one concrete figure; stop scanning at the first one
+    if _NUM_FIND_RE.search(content) is None:
         return None
 
-    query = f"Các mức/con số cụ thể được quy định tại {dieu} {loai} {so_hieu} là bao nhiêu?"
+    query = f"Các mức/con số cụ thể được quy định tại {dieu} {doc['loai_van_ban']} {so_hieu} là bao nhiêu?"
 
     answer_content = _clean(content, 600)
     return {
@@ -295,55 +371,93 @@ def gen_factual_effective_date(doc: dict) -> Optional[dict]:
 
 # ── CASE-STUDY GENERATORS ──
 
+# Each template fires when any keyword occurs in the lowercased article
+# content (and, if needs_numbers, the article quotes concrete figures).
+# case/query are str.format templates over {dieu} and {ref}
+# ("<dieu> <loai_van_ban> <so_hieu>").
 CASE_TEMPLATES = [
     {
-        "condition": lambda doc, art: "thuế" in art["full_content"].lower() and _has_numbers(art["full_content"]),
-        "gen_case": lambda doc, art: f"Một doanh nghiệp/cá nhân cần áp dụng quy định tại {_extract_dieu_number(art['title'])} {doc['loai_van_ban']} {doc['so_hieu']}.",
-        "gen_query": lambda doc, art: f"Theo {_extract_dieu_number(art['title'])}, quy định này áp dụng cụ thể như thế nào cho trường hợp nêu trên?",
+        "keywords": ("thuế",),
+        "needs_numbers": True,
+        "case": "Một doanh nghiệp/cá nhân cần áp dụng quy định tại {ref}.",
+        "query": "Theo {dieu}, quy định này áp dụng cụ thể như thế nào cho trường hợp nêu trên?",
     },
     {
-        "condition": lambda doc, art: any(k in art["full_content"].lower() for k in ["xử phạt", "vi phạm", "phạt tiền", "cưỡng chế"]),
-        "gen_case": lambda doc, art: f"Một tổ chức/cá nhân vi phạm quy định tại {_extract_dieu_number(art['title'])} {doc['loai_van_ban']} {doc['so_hieu']}.",
-        "gen_query": lambda doc, art: f"Hình thức xử lý và mức phạt cụ thể theo {_extract_dieu_number(art['title'])} là gì?",
+        "keywords": ("xử phạt", "vi phạm", "phạt tiền", "cưỡng chế"),
+        "needs_numbers": False,
+        "case": "Một tổ chức/cá nhân vi phạm quy định tại {ref}.",
+        "query": "Hình thức xử lý và mức phạt cụ thể theo {dieu} là gì?",
     },
     {
-        "condition": lambda doc, art: any(k in art["full_content"].lower() for k in ["miễn", "giảm", "ưu đãi", "không chịu thuế", "không phải nộp"]),
-        "gen_case": lambda doc, art: f"Một đối tượng muốn biết mình có thuộc diện miễn/giảm theo {_extract_dieu_number(art['title'])} {doc['loai_van_ban']} {doc['so_hieu']} không.",
-        "gen_query": lambda doc, art: f"Theo {_extract_dieu_number(art['title'])}, những trường hợp nào được miễn/giảm và điều kiện cụ thể là gì?",
+        "keywords": ("miễn", "giảm", "ưu đãi", "không chịu thuế", "không phải nộp"),
+        "needs_numbers": False,
+        "case": "Một đối tượng muốn biết mình có thuộc diện miễn/giảm theo {ref} không.",
+        "query": "Theo {dieu}, những trường hợp nào được miễn/giảm và điều kiện cụ thể là gì?",
     },
     {
-        "condition": lambda doc, art: any(k in art["full_content"].lower() for k in ["thủ tục", "hồ sơ", "trình tự", "đăng ký", "kê khai"]),
-        "gen_case": lambda doc, art: f"Một người nộp thuế cần thực hiện thủ tục theo {_extract_dieu_number(art['title'])} {doc['loai_van_ban']} {doc['so_hieu']}.",
-        "gen_query": lambda doc, art: f"Trình tự, thủ tục và hồ sơ cần thiết theo {_extract_dieu_number(art['title'])} bao gồm những gì?",
+        "keywords": ("thủ tục", "hồ sơ", "trình tự", "đăng ký", "kê khai"),
+        "needs_numbers": False,
+        "case": "Một người nộp thuế cần thực hiện thủ tục theo {ref}.",
+        "query": "Trình tự, thủ tục và hồ sơ cần thiết theo {dieu} bao gồm những gì?",
     },
     {
-        "condition": lambda doc, art: any(k in art["full_content"].lower() for k in ["trách nhiệm", "nghĩa vụ", "quyền", "quyền hạn"]),
-        "gen_case": lambda doc, art: f"Cần xác định trách nhiệm/quyền hạn của các bên theo {_extract_dieu_number(art['title'])} {doc['loai_van_ban']} {doc['so_hieu']}.",
-        "gen_query": lambda doc, art: f"Theo {_extract_dieu_number(art['title'])}, trách nhiệm và quyền hạn cụ thể của các bên được quy định như thế nào?",
+        "keywords": ("trách nhiệm", "nghĩa vụ", "quyền", "quyền hạn"),
+        "needs_numbers": False,
+        "case": "Cần xác định trách nhiệm/quyền hạn của các bên theo {ref}.",
+        "query": "Theo {dieu}, trách nhiệm và quyền hạn cụ thể của các bên được quy định như thế nào?",
     },
 ]
 
 
+def _build_case_automaton():
+    """Aho-Corasick automaton mapping each keyword → indices of its templates."""
+    if ahocorasick is None:
+        return None
+    by_keyword: dict[str, list[int]] = defaultdict(list)
+    for idx, tmpl in enumerate(CASE_TEMPLATES):
+        for kw in tmpl["keywords"]:
+            by_keyword[kw].append(idx)
+    automaton = ahocorasick.Automaton()
+    for kw, idxs in by_keyword.items():
+        automaton.add_word(kw, tuple(idxs))
+    automaton.make_automaton()
+    return automaton
+
+
+_CASE_AUTOMATON = _build_case_automaton()
+
+
 def gen_case_study(doc: dict, article: dict) -> Optional[dict]:
-    """Generate a case-study question from matching templates."""
-    for tmpl in CASE_TEMPLATES:
-        try:
-            if tmpl["condition"](doc, article):
-                case = tmpl["gen_case"](doc, article)
-                query = tmpl["gen_query"](doc, article)
-                content = _clean(article["full_content"], 800)
-
-                return {
-                    "type": "case-study",
-                    "source_doc": doc["so_hieu"],
-                    "source_title": doc["title"],
-                    "article_ref": article["title"],
-                    "case": case,
-                    "query": query,
-                    "expected_answer": f"Theo {_extract_dieu_number(article['title'])} {doc['loai_van_ban']} {doc['so_hieu']}: {content}",
-                }
-        except Exception:
+    """Generate a case-study question from the first matching template.
+
+    With pyahocorasick installed, all template keywords are found in one
+    pass over the content; otherwise each template does substring checks.
+    """
+    lowered = article["_content_lower"]
+    hits = None
+    if _CASE_AUTOMATON is not None:
+        hits = {i for _, idxs in _CASE_AUTOMATON.iter(lowered) for i in idxs}
+
+    for i, tmpl in enumerate(CASE_TEMPLATES):
+        if tmpl["needs_numbers"] and not article["_has_numbers"]:
+            continue
+        if hits is not None:
+            if i not in hits:
+                continue
+        elif not any(k in lowered for k in tmpl["keywords"]):
             continue
+
+        dieu = article["_dieu"]
+        ref = f"{dieu} {doc['loai_van_ban']} {doc['so_hieu']}"
+        return {
+            "type": "case-study",
+            "source_doc": doc["so_hieu"],
+            "source_title": doc["title"],
+            "article_ref": article["title"],
+            "case": tmpl["case"].format(dieu=dieu, ref=ref),
+            "query": tmpl["query"].format(dieu=dieu, ref=ref),
+            "expected_answer": f"Theo {ref}: {article['_clean_800']}",
+        }
     return None
 
 
@@ -355,8 +469,10 @@ def gen_reasoning_multi_article(doc: dict) -> Optional[dict]:
         return None
 
     # Pick 2-3 related articles
-    arts = random.sample(doc["articles"][:min(10, len(doc["articles"]))], min(3, len(doc["articles"])))
-    dieus = [_extract_dieu_number(a["title"]) for a in arts]
+    articles = doc["articles"]
+    k = min(10, len(articles))
+    arts = [articles[i] for i in random.sample(range(k), min(3, k))]
+    dieus = [a["_dieu"] for a in arts]
     so_hieu = doc["so_hieu"]
     loai = doc["loai_van_ban"]
 
@@ -364,7 +480,7 @@ def gen_reasoning_multi_article(doc: dict) -> Optional[dict]:
 
     parts = []
     for a in arts:
-        parts.append(f"- {_extract_dieu_number(a['title'])}: {_clean(a['full_content'], 250)}")
+        parts.append(f"- {a['_dieu']}: {_clean(a['full_content'], 250)}")
 
     return {
         "type": "reasoning",
@@ -509,7 +625,7 @@ def generate_questions_for_doc(doc: dict, max_per_doc: int = 4) -> list[dict]:
         if q:
             candidates["factual"].append(q)
 
-    number_articles = [a for a in articles if _has_numbers(a["full_content"])]
+    number_articles = [a for a in articles if a["_has_numbers"]]
     if number_articles:
         art = random.choice(number_articles)
         q = gen_factual_number(doc, art)
@@ -545,9 +661,8 @@ def generate_questions_for_doc(doc: dict, max_per_doc: int = 4) -> list[dict]:
     # Target mix: 2 factual, 1 case-study OR reasoning, 1 hallucination-trap
     selected = []
 
-    # 1. Pick up to 2 factual
-    facts = candidates["factual"]
-    random.shuffle(facts)
+    # 1. Pick up to 2 factual; a third random draw is step 4's factual spare
+    facts = random.sample(candidates["factual"], min(3, len(candidates["factual"])))
     selected.extend(facts[:2])
 
     # 2. Pick 1 case-study (prefer) or reasoning
@@ -562,10 +677,13 @@ def generate_questions_for_doc(doc: dict, max_per_doc: int = 4) -> list[dict]:
 
     # 4. If room, add 1 more (reasoning > factual > case-study)
     if len(selected) < max_per_doc:
-        for pool_name in ["reasoning", "factual", "case-study"]:
-            for q in candidates[pool_name]:
-                if q not in selected:
+        # Identity, not dict equality: candidates are distinct objects
+        picked_ids = {id(q) for q in selected}
+        for pool in (candidates["reasoning"], facts[2:], candidates["case-study"]):
+            for q in pool:
+                if id(q) not in picked_ids:
                     selected.append(q)
+                    picked_ids.add(id(q))
                     break
             if len(selected) >= max_per_doc:
                 break
@@ -590,44 +708,148 @@ PRIORITY_TYPES = [
 ]
 
 
-def _doc_quality_score(doc: dict) -> float:
+def _doc_features(doc: dict) -> dict:
+    """Scalar quality features of a loaded doc (see _doc_quality_score)."""
+    articles = doc["articles"]
+    return {
+        "enriched": doc["tinh_trang"] not in ("Đã biết", "", None),
+        "num_articles": len(articles),
+        "has_list": any(_has_list_content(a) for a in articles),
+        "has_numbers": any(a["_has_numbers"] for a in articles),
+        "total_len": sum(len(a["full_content"]) for a in articles),
+    }
+
+
+def _doc_quality_score(feat: dict) -> float:
     """Score a doc for selection: more articles, enrichment, content = higher."""
     score = 0.0
     # Enriched docs are much more valuable
-    if doc["tinh_trang"] not in ("Đã biết", "", None):
+    if feat["enriched"]:
         score += 50
     # More articles = richer doc
-    score += min(len(doc["articles"]), 20) * 3
+    score += min(feat["num_articles"], 20) * 3
     # Has list content
-    if any(_has_list_content(a) for a in doc["articles"]):
+    if feat["has_list"]:
         score += 10
     # Has numbers
-    if any(_has_numbers(a["full_content"]) for a in doc["articles"]):
+    if feat["has_numbers"]:
         score += 10
     # Total content length (proxy for substantiveness)
-    total_len = sum(len(a["full_content"]) for a in doc["articles"])
-    score += min(total_len / 500, 20)
+    score += min(feat["total_len"] / 500, 20)
     return score
 
 
+# Below this many docs the JIT compile/dispatch cost outweighs the kernel
+NUMBA_MIN_DOCS = 5000
+
+if numba is not None and np is not None:
+    @numba.njit(cache=True)
+    def _score_kernel(enriched, num_articles, has_list, has_numbers, total_len):
+        """_doc_quality_score over feature arrays, compiled to machine code."""
+        n = enriched.shape[0]
+        out = np.empty(n)
+        for i in range(n):
+            score = 0.0
+            if enriched[i]:
+                score += 50
+            score += min(num_articles[i], 20) * 3
+            if has_list[i]:
+                score += 10
+            if has_numbers[i]:
+                score += 10
+            score += min(total_len[i] / 500, 20)
+            out[i] = score
+        return out
+else:
+    _score_kernel = None
+
+
+def _quality_scores(docs: list[dict]):
+    """_doc_quality_score for every doc.
+
+    One vectorized NumPy pass when available, or a numba kernel for corpora
+    above NUMBA_MIN_DOCS; plain Python otherwise.
+    """
+    if np is None:
+        return [_doc_quality_score(d) for d in docs]
+
+    def column(key, dtype):
+        return np.fromiter((d[key] for d in docs), dtype=dtype, count=len(docs))
+
+    enriched = column("enriched", np.float64)
+    num_articles = column("num_articles", np.float64)
+    has_list = column("has_list", np.float64)
+    has_numbers = column("has_numbers", np.float64)
+    total_len = column("total_len", np.float64)
+    if _score_kernel is not None and len(docs) > NUMBA_MIN_DOCS:
+        return _score_kernel(enriched, num_articles, has_list, has_numbers, total_len)
+    # Same terms, same order as _doc_quality_score → identical floats
+    return (
+        50 * enriched
+        + np.minimum(num_articles, 20) * 3
+        + 10 * has_list
+        + 10 * has_numbers
+        + np.minimum(total_len / 500, 20)
+    )
+
+
+def _load_summary(filepath: str) -> Optional[dict]:
+    """Load a doc and keep only what sampling needs (path, type, features)."""
+    doc = load_document(filepath)
+    if not doc:
+        return None
+    return {
+        "filepath": filepath,
+        "loai_van_ban": doc["loai_van_ban"],
+        **_doc_features(doc),
+    }
+
+
+def _top_k(idxs: list[int], scores, k: int) -> tuple[list[int], list[int]]:
+    """Split a group into its k best docs (best first) and the rest (file order).
+
+    Same k as the head of a stable descending sort, but only those k are
+    ordered: with NumPy, argpartition finds the k-th best score and just the
+    docs at or above it get sorted; otherwise heapq.nlargest.
+    """
+    if k <= 0:
+        return [], list(idxs)
+    if np is not None:
+        idx = np.asarray(idxs)
+        grp_scores = scores[idx]
+        if k < len(idx):
+            kth = grp_scores[np.argpartition(-grp_scores, k - 1)[k - 1]]
+            cand = np.flatnonzero(grp_scores >= kth)  # ascending = file order for ties
+        else:
+            cand = np.arange(len(idx))
+        top_pos = cand[np.argsort(-grp_scores[cand], kind="stable")][:k]
+        rest_mask = np.ones(len(idx), dtype=bool)
+        rest_mask[top_pos] = False
+        return idx[top_pos].tolist(), idx[rest_mask].tolist()
+    top = heapq.nlargest(k, idxs, key=scores.__getitem__)
+    chosen = set(top)
+    return top, [i for i in idxs if i not in chosen]
+
+
 def sample_documents(docs: list[dict], target_questions: int) -> list[dict]:
     """Stratified sampling: pick diverse docs across loai_van_ban to hit target.
 
     Avg ~5 questions/doc, so need target/5 docs.
     Allocates slots proportionally to loai_van_ban, with minimum
     representation for priority types.
+
+    *docs* are the light summaries from ``_load_summary``; the caller
+    reloads only the selected files.
     """
     n_docs_needed = max(target_questions // 5, 40)  # ~5 Q/doc
     logger.info("Need ~%d docs for ~%d questions", n_docs_needed, target_questions)
 
-    # Group by loai_van_ban
-    by_type: dict[str, list[dict]] = defaultdict(list)
-    for d in docs:
-        by_type[d["loai_van_ban"] or "Khác"].append(d)
+    # Group doc indices by loai_van_ban
+    groups: dict[str, list[int]] = defaultdict(list)
+    for i, d in enumerate(docs):
+        groups[d["loai_van_ban"] or "Khác"].append(i)
 
-    # Sort each group by quality (best first)
-    for grp in by_type.values():
-        grp.sort(key=_doc_quality_score, reverse=True)
+    scores = _quality_scores(docs)
 
     # Allocate slots: priority types get guaranteed minimums
     allocation: dict[str, int] = {}
@@ -635,20 +857,20 @@ def sample_documents(docs: list[dict], target_questions: int) -> list[dict]:
 
     # Phase 1: Guarantee at least some from each priority type that exists
     for lt in PRIORITY_TYPES:
-        if lt in by_type and by_type[lt]:
-            count = min(max(2, len(by_type[lt]) * n_docs_needed // len(docs)), len(by_type[lt]))
+        if lt in groups and groups[lt]:
+            count = min(max(2, len(groups[lt]) * n_docs_needed // len(docs)), len(groups[lt]))
             # Boost for Luật / Nghị định / Thông tư (most important)
             if lt in ("Luật", "Nghị định", "Thông tư"):
-                count = min(count + 5, len(by_type[lt]))
+                count = min(count + 5, len(groups[lt]))
             allocation[lt] = count
             remaining -= count
 
     # Phase 2: Fill remaining with best-scoring docs from non-allocated types
-    other_types = [lt for lt in by_type if lt not in allocation]
+    other_types = [lt for lt in groups if lt not in allocation]
     for lt in other_types:
         if remaining <= 0:
             break
-        count = min(max(1, remaining // max(len(other_types), 1)), len(by_type[lt]))
+        count = min(max(1, remaining // max(len(other_types), 1)), len(groups[lt]))
         allocation[lt] = count
         remaining -= count
 
@@ -657,8 +879,8 @@ def sample_documents(docs: list[dict], target_questions: int) -> list[dict]:
         for lt in PRIORITY_TYPES:
             if remaining <= 0:
                 break
-            if lt in by_type:
-                can_add = len(by_type[lt]) - allocation.get(lt, 0)
+            if lt in groups:
+                can_add = len(groups[lt]) - allocation.get(lt, 0)
                 add = min(remaining, can_add)
                 allocation[lt] = allocation.get(lt, 0) + add
                 remaining -= add
@@ -666,19 +888,16 @@ def sample_documents(docs: list[dict], target_questions: int) -> list[dict]:
     # Select docs
     selected = []
     for lt, count in allocation.items():
-        grp = by_type[lt]
-        # Pick top-quality docs, but also sprinkle a few random ones for diversity
+        grp = groups[lt]
+        # Pick top-quality docs, but also sprinkle a few random ones for diversity:
+        # top 60% by quality + 40% random from the rest (all top if <= 3)
         top_n = min(count, len(grp))
-        if top_n <= 3:
-            selected.extend(grp[:top_n])
-        else:
-            # Top 60% by quality + 40% random from the rest
-            n_top = max(top_n * 3 // 5, 1)
-            n_rand = top_n - n_top
-            selected.extend(grp[:n_top])
-            rest = grp[n_top:]
-            if rest and n_rand > 0:
-                selected.extend(random.sample(rest, min(n_rand, len(rest))))
+        n_top = top_n if top_n <= 3 else max(top_n * 3 // 5, 1)
+        n_rand = top_n - n_top
+        top, rest = _top_k(grp, scores, n_top)
+        selected.extend(docs[i] for i in top)
+        if rest and n_rand > 0:
+            selected.extend(docs[i] for i in random.sample(rest, min(n_rand, len(rest))))
 
     random.shuffle(selected)
 
@@ -690,6 +909,63 @@ def sample_documents(docs: list[dict], target_questions: int) -> list[dict]:
     return selected
 
 
+def iter_json_files(root) -> Iterator[str]:
+    """Yield every *.json path under *root* (recursive, skipping dotfiles).
+
+    A lazy os.scandir walk: no fnmatch per entry and no up-front list, and
+    the directory entries' cached type info avoids a stat per file.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_json_files(entry.path)
+            elif entry.name.endswith(".json"):
+                yield entry.path
+
+
+POOL_CHUNK = 64             # files per worker task
+POOL_CHUNKS_PER_WORKER = 2  # tasks in flight per worker
+
+
+def _map_chunk(fn, files: list[str]) -> list:
+    return [fn(path) for path in files]
+
+
+def _pool_map(fn, files: list[str]):
+    """Yield the non-None results of *fn* over *files*, in file order.
+
+    JSON decoding + article extraction is CPU-bound, so it is spread across
+    cores; results come back in order, so sampling stays reproducible. Only
+    a fixed window of chunks is in flight, so a slow consumer (``--all``
+    mode) never has more than that many loaded docs waiting, whatever the
+    corpus size.
+    """
+    workers = os.cpu_count() or 1
+    chunks = (files[i:i + POOL_CHUNK] for i in range(0, len(files), POOL_CHUNK))
+    n_done = n_valid = 0
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque(
+            ex.submit(_map_chunk, fn, chunk)
+            for chunk in islice(chunks, workers * POOL_CHUNKS_PER_WORKER)
+        )
+        while pending:
+            results = pending.popleft().result()
+            # Refill before yielding so the workers stay busy meanwhile
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(ex.submit(_map_chunk, fn, chunk))
+            for result in results:
+                n_done += 1
+                if result:
+                    n_valid += 1
+                    yield result
+                if n_done % 2000 == 0:
+                    logger.info("  Loaded %d/%d files (%d valid docs)...", n_done, len(files), n_valid)
+    logger.info("Loaded %d valid documents (with articles)", n_valid)
+
+
 def main():
     target = 350
     stats_only = False
@@ -708,71 +984,81 @@ def main():
         i += 1
 
     # Load all documents
-    files = sorted(glob.glob(str(PARSED_DIR / "**" / "*.json"), recursive=True))
+    files = sorted(iter_json_files(PARSED_DIR))
     logger.info("Found %d JSON files", len(files))
 
-    docs = []
-    for i, fp in enumerate(files):
-        doc = load_document(fp)
-        if doc:
-            docs.append(doc)
-        if (i + 1) % 2000 == 0:
-            logger.info("  Loaded %d/%d files (%d valid docs)...", i + 1, len(files), len(docs))
-
-    logger.info("Loaded %d valid documents (with articles)", len(docs))
-
-    # Unless --all, sample a diverse subset to hit the target
-    if not all_docs_mode:
-        docs = sample_documents(docs, target)
+    if all_docs_mode:
+        # Stream: each doc is generated from and dropped, never all held at once
+        docs = (_intern_doc(doc) for doc in _pool_map(load_document, files))
+    else:
+        # Sample a diverse subset to hit the target from light per-doc
+        # summaries, then reload only the selected files
+        summaries = list(_pool_map(_load_summary, files))
+        selected = sample_documents(summaries, target)
+        docs = [_intern_doc(doc) for doc in map(load_document, (s["filepath"] for s in selected)) if doc]
 
     if stats_only:
         _show_stats(docs)
         return
 
-    # Generate questions
+    # Generate questions. --all streams each doc's questions to a JSONL file
+    # as they are produced (only counters stay in memory); the sampled set is
+    # small enough to shuffle and save as one indented JSON array.
+    out_path = OUTPUT_FILE.with_suffix(".jsonl") if all_docs_mode else OUTPUT_FILE
     all_questions = []
     type_counts = Counter()
+    source_counts = Counter()
     docs_with_q = 0
+    n_docs = 0
+    n_questions = 0
+    doc_map = {}
+
+    with (open(out_path, "w", encoding="utf-8", buffering=1 << 16) if all_docs_mode else nullcontext()) as jsonl_fp:
+        for doc in docs:
+            n_docs += 1
+            doc_map[doc["so_hieu"]] = doc["loai_van_ban"]
+            qs = generate_questions_for_doc(doc)
+            if qs:
+                docs_with_q += 1
+            for q in qs:
+                type_counts[q["type"]] += 1
+                source_counts[q["source_doc"]] += 1
+            n_questions += len(qs)
+            if jsonl_fp is not None:
+                for q in qs:
+                    jsonl_fp.write(json_line(q))
+            else:
+                all_questions.extend(qs)
 
-    for doc in docs:
-        qs = generate_questions_for_doc(doc)
-        if qs:
-            docs_with_q += 1
-        for q in qs:
-            type_counts[q["type"]] += 1
-        all_questions.extend(qs)
-
-    # Shuffle for variety
-    random.shuffle(all_questions)
+    if not all_docs_mode:
+        # Shuffle for variety
+        random.shuffle(all_questions)
 
-    # Save
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_questions, f, ensure_ascii=False, indent=2)
+        # Save
+        write_json(out_path, all_questions)
 
     # Summary
     print()
     print("=" * 60)
     print("✅ TEST GROUNDTRUTH GENERATION COMPLETE")
     print("=" * 60)
-    print(f"  Documents sampled:     {len(docs)}")
+    print(f"  Documents sampled:     {n_docs}")
     print(f"  Documents with Q&A:    {docs_with_q}")
-    print(f"  Total questions:       {len(all_questions)}")
-    print(f"  Avg per doc:           {len(all_questions)/max(docs_with_q,1):.1f}")
+    print(f"  Total questions:       {n_questions}")
+    print(f"  Avg per doc:           {n_questions/max(docs_with_q,1):.1f}")
     print()
     print("  By type:")
     for t, c in type_counts.most_common():
-        print(f"    {t:25s}: {c:5d} ({c/len(all_questions)*100:.1f}%)")
+        print(f"    {t:25s}: {c:5d} ({c/n_questions*100:.1f}%)")
     print()
     print("  By loai_van_ban:")
-    lvb = Counter(q["source_doc"] for q in all_questions)
     lvb_type = Counter()
-    doc_map = {d["so_hieu"]: d["loai_van_ban"] for d in docs}
-    for sh, cnt in lvb.items():
+    for sh, cnt in source_counts.items():
         lvb_type[doc_map.get(sh, "?")] += cnt
     for lt, c in lvb_type.most_common():
         print(f"    {lt:25s}: {c:5d}")
     print()
-    print(f"  Output: {OUTPUT_FILE}")
+    print(f"  Output: {out_path}")
     print("=" * 60)
 
 
@@ -780,8 +1066,10 @@ def _show_stats(docs):
     """Show statistics about what would be generated."""
     type_counts = Counter()
     docs_with_q = 0
+    n_docs = 0
 
     for doc in docs:
+        n_docs += 1
         qs = generate_questions_for_doc(doc)
         if qs:
             docs_with_q += 1
@@ -793,7 +1081,7 @@ def _show_stats(docs):
     print("=" * 60)
     print("📊 GENERATION STATISTICS (dry run)")
     print("=" * 60)
-    print(f"  Documents:           {len(docs)}")
+    print(f"  Documents:           {n_docs}")
     print(f"  Docs with questions: {docs_with_q}")
     print(f"  Total questions:     {total}")
     print(f"  Avg per doc:         {total/max(docs_with_q,1):.1f}")
@@ -0,0 +1,61 @@
+"""
+JSON helpers shared by the pipeline scripts.
+
+orjson is used when installed, the stdlib json module otherwise; either
+way output is UTF-8 with non-ASCII characters kept as-is.
+"""
+
+import json
+import mmap
+import os
+
+try:
+    import orjson  # optional: 3-5x faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+# Files above this size are memory-mapped instead of read into a bytes object
+MMAP_MIN_SIZE = 256 * 1024
+
+# Parse a JSON document from str or bytes. orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so callers' except clauses work with either parser.
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_line(obj) -> str:
+    """One compact JSONL line, newline-terminated."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8") + "\n"
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+def read_json(path):
+    """Decode a JSON file; large files are parsed straight from an mmap.
+
+    orjson accepts a memoryview, so on POSIX the page cache is parsed
+    without first copying the file into a Python bytes object. Small
+    files (and Windows, or no orjson) use a plain read().
+    """
+    with open(path, "rb") as f:
+        if orjson is not None and os.name == "posix" and os.fstat(f.fileno()).st_size > MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        raw = f.read()
+    return json_loads(raw)
+
+
+def write_json(path, obj, pretty: bool = True) -> None:
+    """Write *obj* to *path* as JSON, 2-space indented unless *pretty* is False."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(obj, option=option)
+    elif pretty:
+        data = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # Encode fully, then one write (json.dump streams many small writes)
+    with open(path, "wb") as f:
+        f.write(data)
@@ -16,15 +16,21 @@ Usage:
     python3 merge_enrichment.py              # dry-run (default)
     python3 merge_enrichment.py --apply      # actually write files
     python3 merge_enrichment.py --stats      # show stats only
+    python3 merge_enrichment.py --reindex    # ignore the cached so_hieu → file index
 """
 
 import json
 import os
+import re
 import sys
 import shutil
 import logging
 from pathlib import Path
 from collections import Counter
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from json_utils import json_line, json_loads, read_json, write_json
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,10 +42,31 @@ logger = logging.getLogger(__name__)
 ROOT = Path(__file__).resolve().parent
 ENRICHMENT_JSONL = ROOT / "outputs" / "enrichment" / "enriched_thue_phi_le_phi.jsonl"
 PARSED_DIR = ROOT / "outputs" / "thue_phi_le_phi"
+INDEX_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+INDEX_HEAD_BYTES = 4096
+MERGE_WORKERS = 8
+SNIFF_BYTES = 64 * 1024
+
+# A parsed file whose first key is document_info (how the parsers write them)
+_DOC_INFO_START_RE = re.compile(rb'\A\s*\{\s*"document_info"\s*:\s*')
+_RAW_DECODER = json.JSONDecoder()
+
+# so_hieu directly inside document_info (no nested object or brace-bearing
+# string before it); captures the raw JSON string body, escapes included
+_SO_HIEU_RE = re.compile(
+    rb'"document_info"\s*:\s*\{[^{}]*?"so_hieu"\s*:\s*"((?:[^"\\]|\\.)*)"'
+)
+
+# Only these entry fields are read downstream; everything else is dropped on load
+_ENTRY_FIELDS = ("match", "validity", "evidence", "error")
 
 
 def load_enrichment() -> dict[str, dict]:
-    """Load enrichment JSONL → dict keyed by so_hieu (best entry per doc)."""
+    """Load enrichment JSONL → dict keyed by so_hieu (best entry per doc).
+
+    Single streaming pass: each kept entry is trimmed to _ENTRY_FIELDS, so
+    memory grows with the number of documents, not the size of the JSONL.
+    """
     enrich_map: dict[str, dict] = {}
 
     with open(ENRICHMENT_JSONL, encoding="utf-8") as f:
@@ -47,39 +74,114 @@ def load_enrichment() -> dict[str, dict]:
             line = line.strip()
             if not line:
                 continue
-            d = json.loads(line)
+            d = json_loads(line)
             o = d.get("original") or {}
             sh = o.get("so_hieu", "").strip()
             if not sh:
                 continue
             # Keep non-error entry over error entry
-            if sh not in enrich_map or (enrich_map[sh].get("error") and not d.get("error")):
-                enrich_map[sh] = d
+            best = enrich_map.get(sh)
+            if best is None or (best.get("error") and not d.get("error")):
+                enrich_map[sh] = {k: d[k] for k in _ENTRY_FIELDS if k in d}
 
     logger.info("Loaded %d unique enrichment entries", len(enrich_map))
     return enrich_map
 
 
-def build_file_index() -> dict[str, list[Path]]:
-    """Scan outputs/thue_phi_le_phi/ → dict keyed by so_hieu → list of file paths."""
-    file_index: dict[str, list[Path]] = {}
+def _read_so_hieu(json_file: Path) -> str:
+    """document_info.so_hieu of a parsed file, without parsing the whole tree.
+
+    Parsers write document_info first, so its so_hieu is nearly always in
+    the first few KiB; the full file is only parsed when the sniff misses.
+    """
+    with open(json_file, "rb") as f:
+        head = f.read(INDEX_HEAD_BYTES)
+    m = _SO_HIEU_RE.search(head)
+    if m:
+        return json_loads(b'"' + m.group(1) + b'"')
+    data = read_json(json_file)
+    return data.get("document_info", {}).get("so_hieu", "")
+
+
+def _index_folder(folder: Path) -> list[tuple[str, Path]]:
+    """Return (so_hieu, path) for every parsed JSON file in *folder*."""
+    pairs = []
+    for json_file in folder.glob("*.json"):
+        try:
+            sh = _read_so_hieu(json_file).strip()
+            if sh:
+                pairs.append((sh, json_file))
+        except (ValueError, KeyError):
+            pass
+    return pairs
+
+
+def _index_cache_path() -> Path:
+    """Index cache file, kept beside (not inside) PARSED_DIR."""
+    return PARSED_DIR.with_name(PARSED_DIR.name + "_index.jsonl")
+
+
+def _index_signature(folders: list[Path]) -> list:
+    """[name, mtime_ns] per folder: adding, removing or renaming a file bumps it."""
+    return [[p.name, p.stat().st_mtime_ns] for p in folders]
+
+
+def _load_index_cache(sig: list) -> Optional[dict[str, list[Path]]]:
+    """The cached index if it was built for *sig*, else None."""
+    try:
+        with open(_index_cache_path(), "rb") as f:
+            if json_loads(f.readline()).get("sig") != sig:
+                return None
+            file_index = {}
+            for line in f:
+                sh, rel_paths = json_loads(line)
+                file_index[sh] = [PARSED_DIR / rel for rel in rel_paths]
+            return file_index
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def _save_index_cache(sig: list, file_index: dict[str, list[Path]]) -> None:
+    """Write the index as JSONL (signature line, then one [so_hieu, paths] per line)."""
+    path = _index_cache_path()
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json_line({"sig": sig}))
+        for sh, paths in file_index.items():
+            rel_paths = [p.relative_to(PARSED_DIR).as_posix() for p in paths]
+            f.write(json_line([sh, rel_paths]))
+    os.replace(tmp_path, path)
+
+
+def build_file_index(refresh: bool = False) -> dict[str, list[Path]]:
+    """Scan outputs/thue_phi_le_phi/ → dict keyed by so_hieu → list of file paths.
+
+    Folders are read concurrently (the work is file IO); results are merged
+    in sorted folder order so the index is the same as a serial scan.
+    The result is cached beside PARSED_DIR and reused while no folder's
+    mtime has changed; refresh=True forces a rescan.
+    """
+    folders = [p for p in sorted(PARSED_DIR.iterdir()) if p.is_dir()]
+    sig = _index_signature(folders)
 
-    for folder in sorted(PARSED_DIR.iterdir()):
-        if not folder.is_dir():
-            continue
-        for json_file in folder.glob("*.json"):
-            try:
-                with open(json_file, encoding="utf-8") as f:
-                    data = json.load(f)
-                sh = data.get("document_info", {}).get("so_hieu", "").strip()
-                if sh:
+    file_index = None if refresh else _load_index_cache(sig)
+    if file_index is not None:
+        source = "cached index"
+    else:
+        source = "scan"
+        file_index = {}
+        with ThreadPoolExecutor(max_workers=INDEX_WORKERS) as pool:
+            for pairs in pool.map(_index_folder, folders):
+                for sh, json_file in pairs:
                     file_index.setdefault(sh, []).append(json_file)
-            except (json.JSONDecodeError, KeyError):
-                pass
+        try:
+            _save_index_cache(sig, file_index)
+        except OSError as e:
+            logger.warning("Could not write index cache: %s", e)
 
     total_files = sum(len(v) for v in file_index.values())
-    logger.info("Indexed %d JSON files (%d unique so_hieu) in %s",
-                total_files, len(file_index), PARSED_DIR)
+    logger.info("Indexed %d JSON files (%d unique so_hieu) in %s (%s)",
+                total_files, len(file_index), PARSED_DIR, source)
     return file_index
 
 
@@ -91,108 +193,157 @@ STATUS_MAP = {
     "suspended": "Tạm ngưng hiệu lực",
     "unknown":   "Không xác định",
 }
+# Interned: the same few labels are written into every merged document_info
+STATUS_MAP = {k: sys.intern(v) for k, v in STATUS_MAP.items()}
 
 
-def apply_enrichment_to_doc_info(doc_info: dict, entry: dict) -> dict:
-    """Write enrichment fields directly into document_info dict.
+def build_enrichment_patch(entry: dict) -> dict:
+    """Flat document_info fields for one enrichment entry.
 
-    Updates tinh_trang and adds enrichment metadata as flat fields.
-    Returns the updated doc_info (mutated in place).
+    tinh_trang is always set; the enrichment metadata fields are only
+    included when present. Built once per so_hieu and shared by all of its
+    files.
     """
     match = entry.get("match") or {}
     validity = entry.get("validity") or {}
     evidence = entry.get("evidence") or {}
 
     status_en = validity.get("status_current", "unknown")
-    tinh_trang_vn = STATUS_MAP.get(status_en, f"Đã biết ({status_en})")
+    tinh_trang_vn = STATUS_MAP.get(status_en)
+    if tinh_trang_vn is None:  # only build the fallback label when needed
+        tinh_trang_vn = f"Đã biết ({status_en})"
 
     # --- Core: overwrite tinh_trang with real status ---
-    doc_info["tinh_trang"] = tinh_trang_vn
+    patch = {"tinh_trang": tinh_trang_vn}
 
     # --- Enrichment metadata (flat, no nesting) ---
     effective = validity.get("effective_date")
     if effective:
-        doc_info["ngay_hieu_luc"] = effective
+        patch["ngay_hieu_luc"] = effective
 
     events = validity.get("events", [])
     if events:
-        doc_info["su_kien_phap_ly"] = events
+        patch["su_kien_phap_ly"] = events
 
     confidence = match.get("confidence")
     if confidence:
-        doc_info["do_khop_vbpl"] = confidence
+        patch["do_khop_vbpl"] = confidence
 
     vbpl_id = match.get("vbpl_item_id")
     if vbpl_id:
-        doc_info["vbpl_item_id"] = vbpl_id
+        patch["vbpl_item_id"] = vbpl_id
 
     vbpl_url = match.get("url")
     if vbpl_url:
-        doc_info["vbpl_url"] = vbpl_url
+        patch["vbpl_url"] = vbpl_url
 
     src_pages = evidence.get("source_pages", [])
     if src_pages:
-        doc_info["vbpl_evidence"] = src_pages
+        patch["vbpl_evidence"] = src_pages
 
     fetched = evidence.get("fetched_at")
     if fetched:
-        doc_info["enriched_at"] = fetched
+        patch["enriched_at"] = fetched
+
+    return patch
+
+
+def apply_enrichment_to_doc_info(doc_info: dict, entry: dict) -> dict:
+    """Write enrichment fields directly into document_info dict.
 
+    Updates tinh_trang and adds enrichment metadata as flat fields.
+    Returns the updated doc_info (mutated in place).
+    """
+    doc_info.update(build_enrichment_patch(entry))
     return doc_info
 
 
-def merge(apply: bool = False):
-    """Main merge logic — writes enrichment directly into document_info."""
-    enrich_map = load_enrichment()
-    file_index = build_file_index()
+def _is_merged(doc_info: dict) -> bool:
+    """Already merged: has enriched_at and tinh_trang is no longer "Đã biết"."""
+    return bool(doc_info.get("enriched_at")) and doc_info.get("tinh_trang") != "Đã biết"
 
-    matched = set(enrich_map.keys()) & set(file_index.keys())
-    mergeable = {sh for sh in matched if not enrich_map[sh].get("error")}
-    error_only = matched - mergeable
 
-    logger.info("Matched: %d, Mergeable: %d, Error-only (skip): %d",
-                len(matched), len(mergeable), len(error_only))
+def _leading_document_info(raw: bytes) -> Optional[dict]:
+    """Decode just document_info when it is the file's first key, else None.
 
-    stats = Counter()
+    Only the first SNIFF_BYTES are decoded and raw_decode stops at the end of
+    that object, so the (large) structure that follows is never touched; a
+    document_info longer than that gives None. The matched prefix is ASCII,
+    so its byte length is also the character offset into the decoded text.
+    """
+    m = _DOC_INFO_START_RE.match(raw)
+    if not m:
+        return None
+    # "ignore" only drops a multi-byte character cut off at the boundary
+    head = raw[:SNIFF_BYTES].decode("utf-8", "ignore")
+    try:
+        doc_info, _ = _RAW_DECODER.raw_decode(head, m.end())
+    except ValueError:
+        return None
+    return doc_info if isinstance(doc_info, dict) else None
 
-    for sh in sorted(mergeable):
-        file_paths = file_index[sh]
-        entry = enrich_map[sh]
 
-        for fpath in file_paths:
-            if not apply:
-                stats["would_merge"] += 1
-                continue
+def _merge_file(fpath: Path, patch: dict) -> list[str]:
+    """Merge one so_hieu's patch into a parsed file; return the stats keys hit."""
+    raw = fpath.read_bytes()
 
-            # Read current file
-            with open(fpath, encoding="utf-8") as f:
-                data = json.load(f)
+    # Cheap pre-check: on reruns most files are done, and deciding that only
+    # needs the leading document_info, not a full parse
+    head_info = _leading_document_info(raw)
+    if head_info is not None and _is_merged(head_info):
+        return ["already_merged"]
 
-            doc_info = data.get("document_info", {})
+    # Read current file
+    data = json_loads(raw)
 
-            # Check if already merged (tinh_trang != "Đã biết" and has enriched_at)
-            if doc_info.get("enriched_at") and doc_info.get("tinh_trang") != "Đã biết":
-                stats["already_merged"] += 1
-                continue
+    doc_info = data.get("document_info", {})
+
+    # Check if already merged (tinh_trang != "Đã biết" and has enriched_at)
+    if _is_merged(doc_info):
+        return ["already_merged"]
+
+    # Apply enrichment directly into document_info
+    doc_info.update(patch)
+    data["document_info"] = doc_info
+    outcome = ["merged"]
 
-            # Apply enrichment directly into document_info
-            apply_enrichment_to_doc_info(doc_info, entry)
-            data["document_info"] = doc_info
+    # Remove old separate 'enrichment' block if it exists
+    if "enrichment" in data:
+        del data["enrichment"]
+        outcome.append("migrated_old_block")
 
-            # Remove old separate 'enrichment' block if it exists
-            had_old_block = "enrichment" in data
-            if had_old_block:
-                del data["enrichment"]
-                stats["migrated_old_block"] += 1
+    # Write back
+    write_json(fpath, data)
+    return outcome
 
-            # Write back
-            with open(fpath, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
 
-            stats["merged"] += 1
+def merge(apply: bool = False, reindex: bool = False):
+    """Main merge logic — writes enrichment directly into document_info."""
+    enrich_map = load_enrichment()
+    file_index = build_file_index(refresh=reindex)
+
+    matched = set(enrich_map.keys()) & set(file_index.keys())
+    mergeable = {sh for sh in matched if not enrich_map[sh].get("error")}
+    error_only = matched - mergeable
 
-            if stats["merged"] % 50 == 0:
-                logger.info("  Merged %d files...", stats["merged"])
+    logger.info("Matched: %d, Mergeable: %d, Error-only (skip): %d",
+                len(matched), len(mergeable), len(error_only))
+
+    stats = Counter()
+
+    if not apply:
+        stats["would_merge"] = sum(len(file_index[sh]) for sh in mergeable)
+    else:
+        # One task per file; files are independent, so reads/writes overlap
+        tasks = []
+        for sh in mergeable:
+            patch = build_enrichment_patch(enrich_map[sh])
+            tasks.extend((fpath, patch) for fpath in file_index[sh])
+        with ThreadPoolExecutor(max_workers=MERGE_WORKERS) as pool:
+            for outcome in pool.map(lambda t: _merge_file(*t), tasks):
+                stats.update(outcome)
+                if "merged" in outcome and stats["merged"] % 50 == 0:
+                    logger.info("  Merged %d files...", stats["merged"])
 
     # Summary
     print()
@@ -213,10 +364,10 @@ def merge(apply: bool = False):
     print("=" * 60)
 
 
-def show_stats():
+def show_stats(reindex: bool = False):
     """Show what enrichment data would look like after merge."""
     enrich_map = load_enrichment()
-    file_index = build_file_index()
+    file_index = build_file_index(refresh=reindex)
 
     matched = set(enrich_map.keys()) & set(file_index.keys())
     mergeable = {sh for sh in matched if not enrich_map[sh].get("error")}
@@ -251,10 +402,10 @@ def show_stats():
         entry = enrich_map[sh]
         v = entry.get("validity") or {}
         if v.get("status_current") not in (None, "unknown") and len(v.get("events", [])) >= 2:
-            block = build_enrichment_block(entry)
+            sample = build_enrichment_patch(entry)
             print()
-            print(f"  Sample merge for {sh}:")
-            print(json.dumps(block, indent=4, ensure_ascii=False))
+            print(f"  Sample merge for {sh} (document_info fields):")
+            print(json.dumps(sample, indent=4, ensure_ascii=False))
             break
 
 
@@ -264,9 +415,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Merge enrichment data into parsed JSON files")
     parser.add_argument("--apply", action="store_true", help="Actually write files (default: dry-run)")
     parser.add_argument("--stats", action="store_true", help="Show statistics only")
+    parser.add_argument("--reindex", action="store_true",
+                        help="Rescan parsed files instead of using the cached so_hieu index")
     args = parser.parse_args()
 
     if args.stats:
-        show_stats()
+        show_stats(reindex=args.reindex)
     else:
-        merge(apply=args.apply)
+        merge(apply=args.apply, reindex=args.reindex)
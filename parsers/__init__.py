@@ -3,6 +3,11 @@ Specialized parsers for Vietnamese legal documents.
 Each document type has its own parser class optimized for its structure.
 """
 
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
 from .base_parser import BaseParser, LegalNode
 from .hierarchical_parser import HierarchicalParser
 from .decision_parser import DecisionParser
@@ -43,14 +48,41 @@ PARSER_MAP = {
     "Nghị quyết": DecisionParser,  # Often short with Điều
 }
 
+@functools.lru_cache(maxsize=None)
 def get_parser(doc_type: str) -> BaseParser:
     """
     Get the appropriate parser for a document type.
     Falls back to HierarchicalParser for unknown types.
+    Parsers keep no per-document state, so one cached instance per doc type
+    is shared by every caller.
     """
     parser_class = PARSER_MAP.get(doc_type, HierarchicalParser)
     return parser_class()
 
+
+def _parse_one(doc: Tuple[str, str, str]) -> Dict[str, Any]:
+    """Process-pool worker: parse one (doc_type, html_content, title) tuple."""
+    doc_type, html_content, title = doc
+    return get_parser(doc_type).parse(html_content, title=title)
+
+
+def parse_batch(docs: Iterable[Tuple[str, str, str]],
+                workers: Optional[int] = None,
+                chunksize: int = 16) -> List[Dict[str, Any]]:
+    """
+    Parse many documents across processes.
+    
+    Each item is (doc_type, html_content, title); results come back in input
+    order. Parsing (BeautifulSoup + regex) is CPU-bound and holds the GIL,
+    so processes scale where threads would not. workers=1 parses in-process.
+    """
+    docs = list(docs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(docs) <= 1:
+        return [_parse_one(doc) for doc in docs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_parse_one, docs, chunksize=chunksize))
+
 __all__ = [
     'BaseParser',
     'LegalNode',
@@ -59,5 +91,6 @@ __all__ = [
     'DirectiveParser',
     'PlanParser',
     'get_parser',
+    'parse_batch',
     'PARSER_MAP',
 ]
@@ -3,13 +3,48 @@ Base parser class and common data structures for legal document parsing.
 """
 
 import re
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from bs4 import BeautifulSoup
 
+try:
+    import lxml  # noqa: F401  (optional: libxml2-backed parser, much faster than html.parser)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
-@dataclass
+
+# Node type labels, interned once and shared by every node the parsers build
+T_DOCUMENT = sys.intern('document')
+T_PART = sys.intern('part')
+T_CHAPTER = sys.intern('chapter')
+T_SECTION = sys.intern('section')
+T_ARTICLE = sys.intern('article')
+T_CLAUSE = sys.intern('clause')
+T_POINT = sys.intern('point')
+T_ITEM = sys.intern('item')
+T_SUBITEM = sys.intern('subitem')
+
+_HEADING_TAGS = frozenset({'h3', 'h4', 'h5'})
+_BOLD_TAGS = ['b', 'strong']
+
+
+def _alternation(patterns: Dict[str, re.Pattern], names) -> re.Pattern:
+    """Fuse the named patterns into one regex of ``(?P<name>...)`` alternatives.
+
+    A pattern compiled with DOTALL keeps it, scoped to its own alternative.
+    """
+    def alternative(name):
+        pattern = patterns[name]
+        body = f"(?s:{pattern.pattern})" if pattern.flags & re.DOTALL else pattern.pattern
+        return f"(?P<{name}>{body})"
+
+    return re.compile("|".join(alternative(name) for name in names), re.IGNORECASE)
+
+
+@dataclass(slots=True)
 class LegalNode:
     """Represents a node in the legal document hierarchy."""
     level: int           # 0=Doc, 1=Part, 2=Chapter, 3=Section, 4=Article, 5=Clause, 6=Point
@@ -20,27 +55,37 @@ class LegalNode:
     html_id: Optional[str] = None  # Original HTML anchor id
     
     def add_text(self, text: str):
-        """Add text content to this node."""
-        if text.strip():
-            self.content.append(text.strip())
+        """Add text content to this node (stored stripped; blank text is dropped)."""
+        text = text.strip()
+        if text:
+            self.content.append(text)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        data = {
-            "type": self.type,
-            "title": self.title,
-        }
+    def _own_dict(self) -> Dict[str, Any]:
+        """This node's fields as a dict, without children."""
+        data = {"type": self.type, "title": self.title}
         if self.html_id:
             data["html_id"] = self.html_id
         
-        full_content = "\n".join(self.content).strip()
-        if full_content:
-            data["content"] = full_content
-        
-        if self.children:
-            data["children"] = [child.to_dict() for child in self.children]
+        # Lines are stripped and non-empty (add_text), so the join needs no strip
+        if self.content:
+            data["content"] = "\n".join(self.content)
         
         return data
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization.
+        
+        Iterative (explicit stack), so deep trees cost no recursion.
+        """
+        root = self._own_dict()
+        stack = [(self, root)]
+        while stack:
+            node, data = stack.pop()
+            if node.children:
+                child_dicts = [child._own_dict() for child in node.children]
+                data["children"] = child_dicts
+                stack.extend(zip(node.children, child_dicts))
+        return root
 
 
 class BaseParser(ABC):
@@ -48,29 +93,52 @@ class BaseParser(ABC):
     
     # Common regex patterns
     PATTERNS = {
-        'part': re.compile(r'(?:^|.*[\.\:\n]\s*)((?:Phần\s+(?:thứ\s+)?[IVX]+|PHẦN\s+(?:THỨ\s+)?[IVX]+|Phần\s+[A-Z]+|PHẦN\s+[A-Z]+).*)\s*$', re.IGNORECASE | re.DOTALL),
-        'chapter': re.compile(r'(?:^|.*[\.\:\n]\s*)(((?:Chương\s+[IVX0-9]+|CHƯƠNG\s+[IVX0-9]+)|(?:[IVX]+)\.\s+).*)\s*$', re.IGNORECASE | re.DOTALL),
-        'section': re.compile(r'(?:^|.*[\.\:\n]\s*)((?:Mục\s+[0-9]+|MỤC\s+[0-9]+).*)\s*$', re.IGNORECASE | re.DOTALL),
-        'article': re.compile(r'^\s*(Điều\s+\d+|ĐIỀU\s+\d+)[\.:]?\s*(.*)', re.IGNORECASE),
-        'point': re.compile(r'^\s*([a-zđ])[\)\\.]\s+(.*)', re.IGNORECASE),
-        'appendix': re.compile(r'^\s*(Phụ lục|PHỤ LỤC|Mẫu số|MẪU SỐ)\s+[0-9IVX]*.*\s*$', re.IGNORECASE),
-        'recipients': re.compile(r'^\s*(Nơi nhận|Nơi gửi)[:;]\s*(.*)', re.IGNORECASE),
-        'signature': re.compile(r'^\s*(TM\.|KT\.|TL\.|PP\.|CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|THỐNG ĐỐC|GIÁM ĐỐC|TỔNG GIÁM ĐỐC|QUYỀN|KÝ THAY|Thay mặt).*\s*$', re.IGNORECASE),
-        'loose_numbering': re.compile(r'^\s*(\d+(\.\d+)*)\.?\s+(.*)'),
+        'part': re.compile(r'(?:^|.*[\.\:\n]\s*+)((?:Phần\s++(?:thứ\s++)?[IVX]++|PHẦN\s++(?:THỨ\s++)?[IVX]++|Phần\s++[A-Z]++|PHẦN\s++[A-Z]++).*)\s*$', re.IGNORECASE | re.DOTALL),
+        'chapter': re.compile(r'(?:^|.*[\.\:\n]\s*+)(((?:Chương\s++[IVX0-9]++|CHƯƠNG\s++[IVX0-9]++)|(?:[IVX]++)\.\s++).*)\s*$', re.IGNORECASE | re.DOTALL),
+        'section': re.compile(r'(?:^|.*[\.\:\n]\s*+)((?:Mục\s++[0-9]++|MỤC\s++[0-9]++).*)\s*$', re.IGNORECASE | re.DOTALL),
+        'article': re.compile(r'^\s*+(Điều\s++\d++|ĐIỀU\s++\d++)[\.:]?\s*+(.*)', re.IGNORECASE),
+        'point': re.compile(r'^\s*+([a-zđ])[\)\\.]\s++(.*)', re.IGNORECASE),
+        'appendix': re.compile(r'^\s*+(Phụ lục|PHỤ LỤC|Mẫu số|MẪU SỐ)\s++[0-9IVX]*+.*+\s*+$', re.IGNORECASE),
+        'recipients': re.compile(r'^\s*+(Nơi nhận|Nơi gửi)[:;]\s*+(.*)', re.IGNORECASE),
+        'signature': re.compile(r'^\s*+(TM\.|KT\.|TL\.|PP\.|CHỦ TỊCH|THỦ TƯỚNG|BỘ TRƯỞNG|THỐNG ĐỐC|GIÁM ĐỐC|TỔNG GIÁM ĐỐC|QUYỀN|KÝ THAY|Thay mặt).*+\s*+$', re.IGNORECASE),
+        'loose_numbering': re.compile(r'^\s*+(\d++(\.\d++)*+)\.?\s++(.*)'),
     }
     
+    # Line-start patterns that never match the same text (they differ in the
+    # first characters), tried in one regex pass: see line_kind()
+    LINE_PATTERN = _alternation(PATTERNS, ('recipients', 'signature', 'article', 'loose_numbering', 'point'))
+    
+    # Block-level tags holding document text in the flat (non-hierarchical) parsers
+    BLOCK_TAGS = frozenset({'p', 'div', 'h3', 'h4', 'h5'})
+    
     def __init__(self):
         self.doc_type = "Unknown"
     
-    def clean_text(self, text: str) -> str:
+    @staticmethod
+    def clean_text(text: str) -> str:
         """Clean and normalize text."""
         if not text:
             return ""
-        return re.sub(r'\s+', ' ', text.replace('\xa0', ' ').replace('\r', '')).strip()
+        # str.split() with no argument splits on runs of any Unicode
+        # whitespace (NBSP included) and drops the ends: collapse + strip in C
+        return ' '.join(text.replace('\r', '').split())
+    
+    def get_normalized_text(self, element) -> str:
+        """Element text, cleaned: same result as clean_text(get_text(" ", strip=True)).
+        
+        Whitespace is normalized once, by split/join, instead of being stripped
+        per string by get_text and then collapsed again by clean_text.
+        """
+        return ' '.join(element.get_text(separator=' ').replace('\r', '').split())
+    
+    def line_kind(self, text: str) -> Optional[str]:
+        """Name of the LINE_PATTERN alternative matching text, or None."""
+        m = self.LINE_PATTERN.match(text)
+        return m.lastgroup if m else None
     
     def get_soup(self, html_content: str) -> BeautifulSoup:
         """Parse HTML and return BeautifulSoup object with content div."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, HTML_PARSER)
         
         # Try to find main content body
         content_div = (
@@ -86,6 +154,32 @@ class BaseParser(ABC):
         
         return content_div
     
+    def iter_elements(self, content_div, tag_names: frozenset, leaf_tags: frozenset = frozenset()):
+        """Yield descendant tags whose name is in tag_names, in document order.
+        
+        Same elements as find_all(list(tag_names)), but lazily: no list of
+        every match is materialized. Tags named in leaf_tags are yielded (if
+        wanted) but not descended into, so e.g. a <span> inside a <p> whose
+        text the <p> already covers is not yielded a second time.
+        """
+        if not leaf_tags:
+            for el in content_div.descendants:
+                if getattr(el, 'name', None) in tag_names:
+                    yield el
+            return
+        
+        stack = [iter(content_div.children)]
+        while stack:
+            for el in stack[-1]:
+                name = getattr(el, 'name', None)
+                if name in tag_names:
+                    yield el
+                if name is not None and name not in leaf_tags:
+                    stack.append(iter(el.children))
+                    break
+            else:
+                stack.pop()
+    
     def detect_anchor_type(self, html_id: Optional[str]) -> Optional[str]:
         """Detect structure type from HTML anchor name attribute."""
         if not html_id:
@@ -110,11 +204,8 @@ class BaseParser(ABC):
     
     def is_bold(self, element) -> bool:
         """Check if an element contains bold text."""
-        if element.find('b') or element.find('strong'):
-            return True
-        if element.name in ['h3', 'h4', 'h5']:
-            return True
-        return False
+        # Tag-name test first (free), then one subtree search for either tag
+        return element.name in _HEADING_TAGS or element.find(_BOLD_TAGS) is not None
     
     @abstractmethod
     def parse(self, html_content: str, title: str = "Document") -> Dict[str, Any]:
@@ -6,7 +6,7 @@ Structure: Simple list of Điều with minimal nesting.
 """
 
 from typing import Dict, Any, List
-from .base_parser import BaseParser, LegalNode
+from .base_parser import BaseParser, LegalNode, T_DOCUMENT, T_ARTICLE, T_CLAUSE, T_POINT
 
 
 class DecisionParser(BaseParser):
@@ -15,6 +15,9 @@ class DecisionParser(BaseParser):
     These are typically short with 2-5 Điều, minimal hierarchy.
     """
     
+    # Node types a numbered line (1., 2., ...) opens a clause under
+    CLAUSE_PARENTS = frozenset({T_ARTICLE, T_CLAUSE, T_POINT})
+    
     def __init__(self):
         super().__init__()
         self.doc_type = "Decision"
@@ -28,38 +31,46 @@ class DecisionParser(BaseParser):
         
         content_div = self.get_soup(html_content)
         
-        root = LegalNode(level=0, type="document", title=title)
+        root = LegalNode(level=0, type=T_DOCUMENT, title=title)
         stack: List[LegalNode] = [root]
         
         metadata = {"recipients": [], "signers": []}
         attachments = []
         is_parsing_metadata = False
         
-        elements = content_div.find_all(['p', 'div', 'h3', 'h4', 'h5'])
+        elements = self.iter_elements(content_div, self.BLOCK_TAGS)
+        
+        # Bind per-element lookups once, outside the loop
+        get_normalized_text = self.get_normalized_text
+        check_bold = self.is_bold
+        line_kind = self.line_kind
+        detect_anchor_type = self.detect_anchor_type
+        match_numbering = self.PATTERNS['loose_numbering'].match
         
         for el in elements:
-            text = self.clean_text(el.get_text(separator=" ", strip=True))
+            text = get_normalized_text(el)
             if not text:
                 continue
             
-            is_bold = self.is_bold(el)
+            is_bold = check_bold(el)
             anchor = el.find('a', attrs={'name': True})
             html_id = anchor['name'] if anchor else None
-            anchor_type = self.detect_anchor_type(html_id)
+            anchor_type = detect_anchor_type(html_id)
+            kind = line_kind(text)
             
             # --- METADATA ---
-            if self.PATTERNS['recipients'].match(text):
+            if kind == 'recipients':
                 is_parsing_metadata = True
                 metadata['recipients'].append(text)
                 continue
             
-            if self.PATTERNS['signature'].match(text) and (len(text) < 100 or is_bold):
+            if kind == 'signature' and (len(text) < 100 or is_bold):
                 is_parsing_metadata = True
                 metadata['signers'].append(text)
                 continue
             
             if is_parsing_metadata:
-                if anchor_type or self.PATTERNS['article'].match(text):
+                if anchor_type or kind == 'article':
                     is_parsing_metadata = False
                 else:
                     if len(text) < 60:
@@ -71,29 +82,33 @@ class DecisionParser(BaseParser):
             
             # Điều detection (anchor or regex)
             if anchor_type == 'article':
-                matched_node = LegalNode(4, "article", text, html_id=html_id)
-            elif self.PATTERNS['article'].match(text):
+                matched_node = LegalNode(4, T_ARTICLE, text, html_id=html_id)
+            elif kind == 'article':
                 # For decisions, accept non-bold articles
-                matched_node = LegalNode(4, "article", text, html_id=html_id)
+                matched_node = LegalNode(4, T_ARTICLE, text, html_id=html_id)
             
             # Clause detection (1., 2., 3...)
-            elif (match := self.PATTERNS['loose_numbering'].match(text)):
+            elif kind == 'loose_numbering':
+                match = match_numbering(text)
                 number = match.group(1)
                 content = match.group(3)
                 
-                if stack[-1].type in ('article', 'clause', 'point'):
-                    matched_node = LegalNode(5, "clause", number)
+                if stack[-1].type in self.CLAUSE_PARENTS:
+                    matched_node = LegalNode(5, T_CLAUSE, number)
                     matched_node.add_text(content)
                 else:
                     stack[-1].add_text(text)
             
             # Point detection (a), b)...)
-            elif self.PATTERNS['point'].match(text):
-                matched_node = LegalNode(6, "point", text, html_id=html_id)
+            elif kind == 'point':
+                matched_node = LegalNode(6, T_POINT, text, html_id=html_id)
             
             # --- STACK UPDATE ---
             if matched_node:
-                while len(stack) > 1 and stack[-1].level >= matched_node.level:
+                # No len(stack) guard needed: root is level 0 and every
+                # matched node is level >= 1, so root is never popped
+                level = matched_node.level
+                while stack[-1].level >= level:
                     stack.pop()
                 stack[-1].children.append(matched_node)
                 stack.append(matched_node)
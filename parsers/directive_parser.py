@@ -6,7 +6,7 @@ Structure: Numbered paragraphs (1., 2., 3...) without formal Điều.
 """
 
 from typing import Dict, Any, List
-from .base_parser import BaseParser, LegalNode
+from .base_parser import BaseParser, LegalNode, T_DOCUMENT, T_POINT, T_ITEM, T_SUBITEM
 
 
 class DirectiveParser(BaseParser):
@@ -15,6 +15,9 @@ class DirectiveParser(BaseParser):
     These use simple numbered paragraphs instead of Điều structure.
     """
     
+    # Node types under which a numbered line starts a (sub)item
+    ITEM_PARENTS = frozenset({T_ITEM, T_SUBITEM})
+    
     def __init__(self):
         super().__init__()
         self.doc_type = "Directive"
@@ -28,28 +31,35 @@ class DirectiveParser(BaseParser):
         
         content_div = self.get_soup(html_content)
         
-        root = LegalNode(level=0, type="document", title=title)
+        root = LegalNode(level=0, type=T_DOCUMENT, title=title)
         stack: List[LegalNode] = [root]
         
         metadata = {"recipients": [], "signers": []}
         is_parsing_metadata = False
         
-        elements = content_div.find_all(['p', 'div', 'h3', 'h4', 'h5'])
+        elements = self.iter_elements(content_div, self.BLOCK_TAGS)
+        
+        # Bind per-element lookups once, outside the loop
+        get_normalized_text = self.get_normalized_text
+        check_bold = self.is_bold
+        line_kind = self.line_kind
+        match_numbering = self.PATTERNS['loose_numbering'].match
         
         for el in elements:
-            text = self.clean_text(el.get_text(separator=" ", strip=True))
+            text = get_normalized_text(el)
             if not text:
                 continue
             
-            is_bold = self.is_bold(el)
+            is_bold = check_bold(el)
+            kind = line_kind(text)
             
             # --- METADATA ---
-            if self.PATTERNS['recipients'].match(text):
+            if kind == 'recipients':
                 is_parsing_metadata = True
                 metadata['recipients'].append(text)
                 continue
             
-            if self.PATTERNS['signature'].match(text) and (len(text) < 100 or is_bold):
+            if kind == 'signature' and (len(text) < 100 or is_bold):
                 is_parsing_metadata = True
                 metadata['signers'].append(text)
                 continue
@@ -63,34 +73,38 @@ class DirectiveParser(BaseParser):
             matched_node = None
             
             # Top-level numbered item (1., 2., 3...)
-            if (match := self.PATTERNS['loose_numbering'].match(text)):
+            if kind == 'loose_numbering':
+                match = match_numbering(text)
                 number = match.group(1)
                 content = match.group(3)
                 
                 # Check if this is a top-level item or sub-item
-                if stack[-1].type == 'document':
+                if stack[-1].type == T_DOCUMENT:
                     # Top-level directive item
-                    matched_node = LegalNode(4, "item", number)
+                    matched_node = LegalNode(4, T_ITEM, number)
                     matched_node.add_text(content)
-                elif stack[-1].type in ('item', 'subitem'):
+                elif stack[-1].type in self.ITEM_PARENTS:
                     # Could be sibling or sub-item
                     if '.' in number:  # 1.1, 2.1 = sub-item
-                        matched_node = LegalNode(5, "subitem", number)
+                        matched_node = LegalNode(5, T_SUBITEM, number)
                         matched_node.add_text(content)
                     else:
                         # Sibling item
-                        matched_node = LegalNode(4, "item", number)
+                        matched_node = LegalNode(4, T_ITEM, number)
                         matched_node.add_text(content)
                 else:
                     stack[-1].add_text(text)
             
             # Point detection (a), b)...)
-            elif self.PATTERNS['point'].match(text):
-                matched_node = LegalNode(6, "point", text)
+            elif kind == 'point':
+                matched_node = LegalNode(6, T_POINT, text)
             
             # --- STACK UPDATE ---
             if matched_node:
-                while len(stack) > 1 and stack[-1].level >= matched_node.level:
+                # No len(stack) guard needed: root is level 0 and every
+                # matched node is level >= 1, so root is never popped
+                level = matched_node.level
+                while stack[-1].level >= level:
                     stack.pop()
                 stack[-1].children.append(matched_node)
                 stack.append(matched_node)
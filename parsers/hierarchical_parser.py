@@ -5,8 +5,18 @@ Handles: Thông tư, Luật, Nghị định, Pháp lệnh, Văn bản hợp nh
 Structure: Phần → Chương → Mục → Điều → Khoản → Điểm
 """
 
+import functools
 from typing import Dict, Any, List, Optional
-from .base_parser import BaseParser, LegalNode
+from .base_parser import (
+    BaseParser, LegalNode, _alternation,
+    T_DOCUMENT, T_PART, T_CHAPTER, T_SECTION, T_ARTICLE, T_CLAUSE, T_POINT,
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _title_key(title: str) -> str:
+    """Normalized title for duplicate checks (cached: siblings are re-compared)."""
+    return BaseParser.clean_text(title).lower().rstrip('.')
 
 
 class HierarchicalParser(BaseParser):
@@ -15,6 +25,29 @@ class HierarchicalParser(BaseParser):
     Uses a stack-based algorithm to build nested structure with duplication check.
     """
     
+    # Structural patterns that end a metadata (recipients/signers) run, fused
+    # so each line is tried once instead of once per pattern
+    METADATA_BREAK_PATTERN = _alternation(
+        BaseParser.PATTERNS, ('part', 'chapter', 'section', 'article', 'appendix')
+    )
+    
+    # Tags whose text is read line by line; tables come through whole (and
+    # again cell by cell), inline/heading blocks once, without their children
+    ELEMENT_TAGS = frozenset({'p', 'div', 'h3', 'h4', 'h5', 'table', 'span'})
+    LEAF_TAGS = frozenset({'p', 'h3', 'h4', 'h5', 'span'})
+    
+    # Node types under which a numbered line starts a new clause
+    CLAUSE_PARENTS = frozenset({T_ARTICLE, T_CLAUSE, T_POINT})
+    
+    # Anchor type -> (level, node type) for anchor-based matching
+    ANCHOR_NODES = {
+        'part': (1, T_PART),
+        'chapter': (2, T_CHAPTER),
+        'section': (3, T_SECTION),
+        'article': (4, T_ARTICLE),
+        'clause': (5, T_CLAUSE),
+    }
+    
     def __init__(self):
         super().__init__()
         self.doc_type = "Hierarchical"
@@ -27,8 +60,8 @@ class HierarchicalParser(BaseParser):
         if node1.type != node2.type:
             return False
             
-        t1 = self.clean_text(node1.title).lower().rstrip('.')
-        t2 = self.clean_text(node2.title).lower().rstrip('.')
+        t1 = _title_key(node1.title)
+        t2 = _title_key(node2.title)
         
         # Exact match
         if t1 == t2:
@@ -36,12 +69,9 @@ class HierarchicalParser(BaseParser):
             
         # Prefix match (e.g. "1" and "1. Phạm vi")
         # Ensure regex false positive protection (e.g. "Điều 1" vs "Điều 10" -> No)
-        if t1.startswith(t2 + ".") or t1.startswith(t2 + " ") or t1.startswith(t2 + ":"):
-            return True
-        if t2.startswith(t1 + ".") or t2.startswith(t1 + " ") or t2.startswith(t1 + ":"):
-            return True
-            
-        return False
+        short, long_ = (t1, t2) if len(t1) < len(t2) else (t2, t1)
+        return (len(long_) > len(short) and long_.startswith(short)
+                and long_[len(short)] in '. :')
 
     def parse(self, html_content: str, title: str = "Document") -> Dict[str, Any]:
         """
@@ -53,7 +83,7 @@ class HierarchicalParser(BaseParser):
         content_div = self.get_soup(html_content)
         
         # Initialize root node
-        root = LegalNode(level=0, type="document", title=title)
+        root = LegalNode(level=0, type=T_DOCUMENT, title=title)
         stack: List[LegalNode] = [root]
         
         # Metadata holders
@@ -65,34 +95,51 @@ class HierarchicalParser(BaseParser):
         is_parsing_metadata = False
         
         # Get all relevant elements
-        elements = content_div.find_all(['p', 'div', 'h3', 'h4', 'h5', 'table', 'span'])
+        elements = self.iter_elements(content_div, self.ELEMENT_TAGS, self.LEAF_TAGS)
+        
+        # Bind per-element lookups once, outside the loop
+        get_normalized_text = self.get_normalized_text
+        check_bold = self.is_bold
+        detect_anchor_type = self.detect_anchor_type
+        match_meta_break = self.METADATA_BREAK_PATTERN.match
+        line_kind = self.line_kind
+        PATTERNS = self.PATTERNS
+        match_part = PATTERNS['part'].match
+        match_chapter = PATTERNS['chapter'].match
+        match_section = PATTERNS['section'].match
+        match_appendix = PATTERNS['appendix'].match
+        match_numbering = PATTERNS['loose_numbering'].match
+        anchor_nodes = self.ANCHOR_NODES
+        clause_parents = self.CLAUSE_PARENTS
         
         for el in elements:
-            text = self.clean_text(el.get_text(separator=" ", strip=True))
+            text = get_normalized_text(el)
             if not text:
                 continue
             
-            is_bold = self.is_bold(el)
+            is_bold = check_bold(el)
             
             # Get anchor if present
             anchor = el.find('a', attrs={'name': True})
             html_id = anchor['name'] if anchor else None
-            anchor_type = self.detect_anchor_type(html_id)
+            anchor_type = detect_anchor_type(html_id)
+            # recipients/signature/article/loose_numbering/point in one pass;
+            # part/chapter/section can match mid-line, so they stay separate
+            kind = line_kind(text)
             
             # --- METADATA DETECTION ---
-            if self.PATTERNS['recipients'].match(text):
+            if kind == 'recipients':
                 is_parsing_metadata = True
                 metadata['recipients'].append(text)
                 continue
             
-            if self.PATTERNS['signature'].match(text) and (len(text) < 100 or is_bold):
+            if kind == 'signature' and (len(text) < 100 or is_bold):
                 is_parsing_metadata = True
                 metadata['signers'].append(text)
                 continue
             
             if is_parsing_metadata:
-                if anchor_type or any(p.match(text) for k, p in self.PATTERNS.items() 
-                                      if k not in ['recipients', 'signature', 'loose_numbering', 'point']):
+                if anchor_type or match_meta_break(text):
                     is_parsing_metadata = False
                 else:
                     if len(text) < 50 and (text[0].isupper() or text.startswith("-")):
@@ -102,7 +149,7 @@ class HierarchicalParser(BaseParser):
                     continue
             
             # --- APPENDIX DETECTION ---
-            is_appendix_header = self.PATTERNS['appendix'].match(text) and (is_bold or len(text) < 100)
+            is_appendix_header = match_appendix(text) and (is_bold or len(text) < 100)
             
             if is_appendix_header:
                 is_parsing_appendices = True
@@ -110,10 +157,10 @@ class HierarchicalParser(BaseParser):
                 continue
             
             if is_parsing_appendices:
-                if self.PATTERNS['recipients'].match(text) or self.PATTERNS['signature'].match(text):
+                if kind == 'recipients' or kind == 'signature':
                     is_parsing_appendices = False
                     is_parsing_metadata = True
-                    if self.PATTERNS['recipients'].match(text):
+                    if kind == 'recipients':
                         metadata['recipients'].append(text)
                     else:
                         metadata['signers'].append(text)
@@ -127,45 +174,37 @@ class HierarchicalParser(BaseParser):
             matched_node = None
             
             # Priority 1: Anchor-based
-            if anchor_type == 'part':
-                matched_node = LegalNode(1, "part", text, html_id=html_id)
-            elif anchor_type == 'chapter':
-                matched_node = LegalNode(2, "chapter", text, html_id=html_id)
-            elif anchor_type == 'section':
-                matched_node = LegalNode(3, "section", text, html_id=html_id)
-            elif anchor_type == 'article':
-                matched_node = LegalNode(4, "article", text, html_id=html_id)
-            elif anchor_type == 'clause':
-                matched_node = LegalNode(5, "clause", text, html_id=html_id)
+            anchor_node = anchor_nodes.get(anchor_type)
+            if anchor_node:
+                matched_node = LegalNode(*anchor_node, text, html_id=html_id)
             
             # Priority 2: Regex pattern
             if not matched_node:
-                if self.PATTERNS['part'].match(text) and is_bold:
-                    matched_node = LegalNode(1, "part", text, html_id=html_id)
-                elif self.PATTERNS['chapter'].match(text) and is_bold:
-                    matched_node = LegalNode(2, "chapter", text, html_id=html_id)
-                elif self.PATTERNS['section'].match(text) and is_bold:
-                    matched_node = LegalNode(3, "section", text, html_id=html_id)
-                elif self.PATTERNS['article'].match(text):
-                    matched_node = LegalNode(4, "article", text, html_id=html_id)
+                # Headings must be bold: test that before running their regexes
+                if is_bold and match_part(text):
+                    matched_node = LegalNode(1, T_PART, text, html_id=html_id)
+                elif is_bold and match_chapter(text):
+                    matched_node = LegalNode(2, T_CHAPTER, text, html_id=html_id)
+                elif is_bold and match_section(text):
+                    matched_node = LegalNode(3, T_SECTION, text, html_id=html_id)
+                elif kind == 'article':
+                    matched_node = LegalNode(4, T_ARTICLE, text, html_id=html_id)
                 
                 # Clause detection (1., 2....)
-                elif (match := self.PATTERNS['loose_numbering'].match(text)):
+                elif kind == 'loose_numbering':
+                    match = match_numbering(text)
                     number = match.group(1)
                     content = match.group(3)
                     
-                    if stack[-1].type in ('clause', 'point'):
-                        matched_node = LegalNode(5, "clause", number)
-                        matched_node.add_text(content)
-                    elif stack[-1].type == 'article':
-                        matched_node = LegalNode(5, "clause", number)
+                    if stack[-1].type in clause_parents:
+                        matched_node = LegalNode(5, T_CLAUSE, number)
                         matched_node.add_text(content)
                     else:
                         stack[-1].add_text(text)
                 
                 # Point detection (a), b)...)
-                elif self.PATTERNS['point'].match(text):
-                    matched_node = LegalNode(6, "point", text, html_id=html_id)
+                elif kind == 'point':
+                    matched_node = LegalNode(6, T_POINT, text, html_id=html_id)
             
             # --- STACK UPDATE WITH DUPLICATION CHECK ---
             if matched_node:
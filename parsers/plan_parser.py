@@ -7,7 +7,7 @@ Structure: Roman numerals (I., II., III.) with Arabic sub-sections.
 
 import re
 from typing import Dict, Any, List
-from .base_parser import BaseParser, LegalNode
+from .base_parser import BaseParser, LegalNode, T_DOCUMENT, T_SECTION, T_POINT, T_ITEM
 
 
 class PlanParser(BaseParser):
@@ -16,8 +16,11 @@ class PlanParser(BaseParser):
     These use Roman numeral sections with Arabic numbered sub-items.
     """
     
+    # Node types under which a numbered line starts an item
+    ITEM_PARENTS = frozenset({T_SECTION, T_ITEM, T_POINT})
+    
     # Additional patterns for plan documents
-    ROMAN_SECTION = re.compile(r'^\s*([IVX]+)\.\s*(.*)', re.IGNORECASE)
+    ROMAN_SECTION = re.compile(r'^\s*+([IVX]++)\.\s*+(.*)', re.IGNORECASE)
     
     def __init__(self):
         super().__init__()
@@ -32,28 +35,35 @@ class PlanParser(BaseParser):
         
         content_div = self.get_soup(html_content)
         
-        root = LegalNode(level=0, type="document", title=title)
+        root = LegalNode(level=0, type=T_DOCUMENT, title=title)
         stack: List[LegalNode] = [root]
         
         metadata = {"recipients": [], "signers": []}
         is_parsing_metadata = False
         
-        elements = content_div.find_all(['p', 'div', 'h3', 'h4', 'h5'])
+        elements = self.iter_elements(content_div, self.BLOCK_TAGS)
+        
+        # Bind per-element lookups once, outside the loop
+        get_normalized_text = self.get_normalized_text
+        check_bold = self.is_bold
+        line_kind = self.line_kind
+        match_numbering = self.PATTERNS['loose_numbering'].match
         
         for el in elements:
-            text = self.clean_text(el.get_text(separator=" ", strip=True))
+            text = get_normalized_text(el)
             if not text:
                 continue
             
-            is_bold = self.is_bold(el)
+            is_bold = check_bold(el)
+            kind = line_kind(text)
             
             # --- METADATA ---
-            if self.PATTERNS['recipients'].match(text):
+            if kind == 'recipients':
                 is_parsing_metadata = True
                 metadata['recipients'].append(text)
                 continue
             
-            if self.PATTERNS['signature'].match(text) and (len(text) < 100 or is_bold):
+            if kind == 'signature' and (len(text) < 100 or is_bold):
                 is_parsing_metadata = True
                 metadata['signers'].append(text)
                 continue
@@ -67,29 +77,33 @@ class PlanParser(BaseParser):
             matched_node = None
             
             # Roman numeral section (I., II., III...)
-            if (match := self.ROMAN_SECTION.match(text)) and is_bold:
+            if is_bold and (match := self.ROMAN_SECTION.match(text)):
                 roman = match.group(1)
                 section_title = match.group(2)
-                matched_node = LegalNode(2, "section", f"{roman}. {section_title}")
+                matched_node = LegalNode(2, T_SECTION, f"{roman}. {section_title}")
             
             # Arabic numbered item (1., 2., 3...)
-            elif (match := self.PATTERNS['loose_numbering'].match(text)):
+            elif kind == 'loose_numbering':
+                match = match_numbering(text)
                 number = match.group(1)
                 content = match.group(3)
                 
-                if stack[-1].type in ('section', 'item', 'point'):
-                    matched_node = LegalNode(4, "item", number)
+                if stack[-1].type in self.ITEM_PARENTS:
+                    matched_node = LegalNode(4, T_ITEM, number)
                     matched_node.add_text(content)
                 else:
                     stack[-1].add_text(text)
             
             # Point detection (a), b)...)
-            elif self.PATTERNS['point'].match(text):
-                matched_node = LegalNode(6, "point", text)
+            elif kind == 'point':
+                matched_node = LegalNode(6, T_POINT, text)
             
             # --- STACK UPDATE ---
             if matched_node:
-                while len(stack) > 1 and stack[-1].level >= matched_node.level:
+                # No len(stack) guard needed: root is level 0 and every
+                # matched node is level >= 1, so root is never popped
+                level = matched_node.level
+                while stack[-1].level >= level:
                     stack.pop()
                 stack[-1].children.append(matched_node)
                 stack.append(matched_node)
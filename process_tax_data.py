@@ -4,44 +4,74 @@ Process all documents in Thue-Phi-Le-Phi (Tax-Fee-Levy) category.
 Outputs structured JSON files and raw TXT files for each document.
 """
 
-import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
 from bs4 import BeautifulSoup
 
+try:
+    from lxml import etree, html as lxml_html  # optional: plain-text extraction without a BeautifulSoup tree
+except ImportError:
+    lxml_html = None
+
 sys.path.insert(0, '.')
 from datasets import load_from_disk
 from parsers import get_parser
+from parsers.base_parser import HTML_PARSER
+from json_utils import write_json
 
 # Output directories
 OUTPUT_DIR = Path("outputs/thue_phi_le_phi")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Characters not allowed in filenames, mapped to '_' in one translate() pass
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
 def sanitize_filename(name: str, max_len: int = 80) -> str:
     """Create safe filename from document title."""
-    invalid = '<>:"/\\|?*'
-    for char in invalid:
-        name = name.replace(char, '_')
-    name = '_'.join(name.split())
-    return name[:max_len]
+    return '_'.join(name.translate(_SANITIZE_TABLE).split())[:max_len]
 
-def save_raw_text(html_content: str, output_path: Path):
-    """Clean HTML tags and save as plain text."""
-    if not html_content:
-        return
+if lxml_html is not None:
+    # Every text node in document order (an element's text and its tail come
+    # back separately, matching BeautifulSoup's strings)
+    _TEXT_NODES = etree.XPath('//text()')
+_SKIP_TEXT_TAGS = frozenset({'script', 'style'})
+
+def extract_raw_text(html_content: str) -> str:
+    """Clean HTML tags and return plain text."""
+    if lxml_html is not None:
+        try:
+            root = lxml_html.document_fromstring(html_content)
+        except etree.ParserError:
+            return ''  # empty / whitespace-only document
+        except ValueError:
+            pass  # str with an XML encoding declaration: let BeautifulSoup handle it
+        else:
+            parts = []
+            for node in _TEXT_NODES(root):
+                if not node.is_tail and node.getparent().tag in _SKIP_TEXT_TAGS:
+                    continue
+                node = node.strip()
+                if node:
+                    parts.append(node)
+            return '\n\n'.join(parts)
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER)
     
     # Remove scripts and styles
     for script in soup(["script", "style"]):
         script.extract()
         
-    text = soup.get_text(separator='\n\n', strip=True)
+    return soup.get_text(separator='\n\n', strip=True)
+
+def save_raw_text(html_content: str, output_path: Path):
+    """Clean HTML tags and save as plain text."""
+    if not html_content:
+        return
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(text)
+    output_path.write_text(extract_raw_text(html_content), encoding='utf-8')
 
 def process_document(item: dict) -> dict:
     """Process a single document."""
@@ -70,7 +100,23 @@ def process_document(item: dict) -> dict:
         "raw_html": html  # Return this to save as txt later if needed, but we pass item to loop
     }
 
-def main():
+def _process_item(item: dict):
+    """
+    Pool worker: parse one document and extract its plain text.
+    Returns (result, raw_text, error); result is None for documents
+    without HTML or when parsing failed (error is then the message).
+    """
+    try:
+        result = process_document(item)
+        if not result:
+            return None, None, None
+        # Don't save raw_html in JSON to keep it clean, user requested separate txt
+        html = result.pop('raw_html', '')
+        return result, extract_raw_text(html), None
+    except Exception as e:
+        return None, None, str(e)
+
+def main(workers: int = None):
     print("Loading dataset...")
     ds = load_from_disk('data_universal')
     
@@ -85,26 +131,46 @@ def main():
     success = 0
     errors = 0
     
-    for item in tqdm(tax_docs, desc="Processing"):
-        try:
-            # Process JSON
-            result = process_document(item)
-            if result:
+    # Create the per-type folders up front instead of once per document, and
+    # remember which JSON names already exist so collisions are resolved in
+    # memory rather than with one stat() per candidate name.
+    taken_names = {}
+    for doc_type in {item.get('loai_van_ban', 'Unknown') for item in tax_docs if item.get('noi_dung_html')}:
+        type_dir = OUTPUT_DIR / sanitize_filename(doc_type)
+        type_dir.mkdir(exist_ok=True)
+        taken_names[type_dir] = {n for n in os.listdir(type_dir) if n.endswith('.json')}
+    next_suffix = {}
+    
+    # Parsing is CPU-bound (BeautifulSoup + regex): fan it out over processes.
+    # map() keeps input order, so filename collision handling below (done here,
+    # in the parent) assigns the same names as a serial run.
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        outcomes = pool.map(_process_item, tax_docs, chunksize=16)
+        for item, (result, raw_text, error) in zip(tax_docs, tqdm(outcomes, total=len(tax_docs), desc="Processing")):
+            if error is not None:
+                errors += 1
+                print(f"\n⚠️ Error: {item.get('title', '')[:50]}... - {error}")
+                continue
+            if not result:
+                continue
+            try:
                 doc_type = item.get('loai_van_ban', 'Unknown')
                 type_dir = OUTPUT_DIR / sanitize_filename(doc_type)
-                type_dir.mkdir(exist_ok=True)
                 
                 # Base filename
                 filename = sanitize_filename(item.get('so_hieu', '') or item.get('title', 'doc'))
                 
                 # Handle duplicate filenames (check availability based on json)
-                counter = 1
-                base_path = type_dir / filename
-                json_path = base_path.with_suffix('.json')
-                
-                while json_path.exists():
-                    json_path = type_dir / f"{filename}_{counter}.json"
-                    counter += 1
+                taken = taken_names[type_dir]
+                json_name = (type_dir / filename).with_suffix('.json').name
+                if json_name in taken:
+                    counter = next_suffix.get((type_dir, filename), 1)
+                    while f"{filename}_{counter}.json" in taken:
+                        counter += 1
+                    next_suffix[(type_dir, filename)] = counter + 1
+                    json_name = f"{filename}_{counter}.json"
+                taken.add(json_name)
+                json_path = type_dir / json_name
                 
                 # Final paths
                 final_json_path = json_path
@@ -112,19 +178,15 @@ def main():
                 final_txt_path = final_json_path.with_suffix('.txt')
                 
                 # Save JSON
-                with open(final_json_path, 'w', encoding='utf-8') as f:
-                    # Don't save raw_html in JSON to keep it clean, user requested separate txt
-                    if 'raw_html' in result:
-                        del result['raw_html']
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+                write_json(final_json_path, result)
                 
                 # Save Raw Text
-                save_raw_text(item.get('noi_dung_html', ''), final_txt_path)
+                final_txt_path.write_text(raw_text, encoding='utf-8')
                 
                 success += 1
-        except Exception as e:
-            errors += 1
-            print(f"\n⚠️ Error: {item.get('title', '')[:50]}... - {e}")
+            except Exception as e:
+                errors += 1
+                print(f"\n⚠️ Error: {item.get('title', '')[:50]}... - {e}")
     
     print(f"\n✅ Complete!")
     print(f"   Processed: {success}")
@@ -132,4 +194,10 @@ def main():
     print(f"   Output: {OUTPUT_DIR}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Parse Thue-Phi-Le-Phi documents into JSON + TXT")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes (default: CPU count)")
+    args = parser.parse_args()
+    main(workers=args.workers)
@@ -7,16 +7,17 @@ Step 2: Run enrichment from cached list (avoids slow dataset loading).
 import json
 import os
 import sys
-import time
-import random
 import logging
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Ensure project root importable
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
+from json_utils import json_line, json_loads, read_json, write_json
+
 OUT_DIR = ROOT / "outputs" / "enrichment"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_FILE = OUT_DIR / "tax_docs_cache.json"
@@ -37,6 +38,14 @@ logger = logging.getLogger(__name__)
 # Step 1: Cache
 # ──────────────────────────────────────
 
+def _is_central_tax_doc(categories, loai_vbs, so_hieus):
+    """Batched dataset.filter predicate (top-level so it pickles for num_proc)."""
+    return [
+        cat == "Thue-Phi-Le-Phi" and loai in CENTRAL_TYPES and bool(sh and sh.strip())
+        for cat, loai, sh in zip(categories, loai_vbs, so_hieus)
+    ]
+
+
 def build_cache():
     """Read dataset once, save filtered list to JSON."""
     from datasets import load_from_disk
@@ -45,42 +54,44 @@ def build_cache():
     ds = load_from_disk(str(ROOT / "data_universal"))
     train = ds["train"]
 
+    # Filter inside Arrow, touching only the three predicate columns, so the
+    # big text columns are never decoded into Python
+    logger.info("Filtering...")
+    matched = train.filter(
+        _is_central_tax_doc,
+        input_columns=["category", "loai_van_ban", "so_hieu"],
+        batched=True,
+        num_proc=os.cpu_count(),
+    )
+
     logger.info("Reading columns...")
-    categories = train["category"]
-    loai_vbs = train["loai_van_ban"]
-    so_hieus = train["so_hieu"]
-    titles = train["title"]
+    n = len(matched)
+    categories = matched["category"]
+    loai_vbs = matched["loai_van_ban"]
+    so_hieus = matched["so_hieu"]
+    titles = matched["title"]
     # Optional columns
-    tinh_trangs = train["tinh_trang"] if "tinh_trang" in train.column_names else [""] * len(categories)
-    ngay_bhs = train["ngay_ban_hanh"] if "ngay_ban_hanh" in train.column_names else [""] * len(categories)
-    links = train["link"] if "link" in train.column_names else [""] * len(categories)
-
-    logger.info("Filtering...")
-    docs = []
-    for i in range(len(categories)):
-        if (categories[i] == "Thue-Phi-Le-Phi"
-                and loai_vbs[i] in CENTRAL_TYPES
-                and so_hieus[i] and so_hieus[i].strip()):
-            docs.append({
-                "so_hieu": so_hieus[i].strip(),
+    tinh_trangs = matched["tinh_trang"] if "tinh_trang" in matched.column_names else [""] * n
+    ngay_bhs = matched["ngay_ban_hanh"] if "ngay_ban_hanh" in matched.column_names else [""] * n
+    links = matched["link"] if "link" in matched.column_names else [""] * n
+
+    # Deduplicate on so_hieu while building (first occurrence wins)
+    by_so_hieu: dict[str, dict] = {}
+    for i in range(n):
+        sh = so_hieus[i].strip()
+        if sh not in by_so_hieu:
+            by_so_hieu[sh] = {
+                "so_hieu": sh,
                 "title": titles[i],
                 "loai_van_ban": loai_vbs[i],
                 "category": categories[i],
                 "tinh_trang": tinh_trangs[i] or "",
                 "ngay_ban_hanh": ngay_bhs[i] or "",
                 "link": links[i] or "",
-            })
+            }
+    unique = list(by_so_hieu.values())
 
-    # Deduplicate
-    seen = set()
-    unique = []
-    for d in docs:
-        if d["so_hieu"] not in seen:
-            seen.add(d["so_hieu"])
-            unique.append(d)
-
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(unique, f, ensure_ascii=False, indent=2)
+    write_json(CACHE_FILE, unique)
 
     logger.info("Cached %d unique docs → %s", len(unique), CACHE_FILE)
     return unique
@@ -95,33 +106,133 @@ JITTER_MAX = 1.0
 BACKOFF_FACTOR = 2.0
 MAX_DELAY = 60.0
 MAX_RETRIES = 3
+DEFAULT_WORKERS = 4
+
+
+def _done_path() -> Path:
+    """
+    Checkpoint sidecar next to OUTPUT_JSONL: one ``so_hieu<TAB>size`` line per
+    finished doc, *size* being the JSONL's byte size once that record was
+    written.
+    """
+    return OUTPUT_JSONL.with_suffix(".done")
 
 
 def load_checkpoint() -> set[str]:
+    done_path = _done_path()
+    if not OUTPUT_JSONL.exists():
+        # A sidecar without its JSONL is stale: never skip docs on its say-so
+        done_path.unlink(missing_ok=True)
+        return set()
+
+    jsonl_size = OUTPUT_JSONL.stat().st_size
+    if done_path.exists():
+        done = set()
+        last_size = None
+        for line in done_path.read_text(encoding="utf-8").split("\n"):
+            sh, sep, size = line.rpartition("\t")
+            if sep and size.isdigit():
+                done.add(sh)
+                last_size = int(size)
+        # Trust the sidecar only if it accounts for exactly the JSONL on disk;
+        # anything else (crash between the two writes, the JSONL rewritten or
+        # appended to by another runner) falls through to a rescan
+        if last_size == jsonl_size:
+            return done
+        logger.info("Checkpoint sidecar out of date, rescanning %s", OUTPUT_JSONL.name)
+
+    # Rebuild the sidecar from the JSONL
     done = set()
-    if OUTPUT_JSONL.exists():
-        with open(OUTPUT_JSONL, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    r = json.loads(line)
-                    sh = r.get("original", {}).get("so_hieu", "")
-                    if sh:
-                        done.add(sh)
-                except json.JSONDecodeError:
-                    pass
+    with open(OUTPUT_JSONL, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                r = json_loads(line)
+                sh = r.get("original", {}).get("so_hieu", "")
+                if sh:
+                    done.add(sh)
+            except json.JSONDecodeError:
+                pass
+    done_path.write_text("".join(f"{sh}\t{jsonl_size}\n" for sh in done), encoding="utf-8")
     return done
 
 
-def run_enrichment(docs: list[dict], fresh: bool = False):
+def _enrich_with_retries(item: dict, searcher, scraper, delay) -> tuple[dict, list[str]]:
+    """
+    Search + enrich one cached doc with retries, then pause before the next.
+    *delay* is the run's shared AdaptiveDelay. Returns (record, stats keys
+    to count).
+    """
+    so_hieu = item["so_hieu"]
+    record = {
+        "original": item,
+        "match": None,
+        "validity": None,
+        "evidence": None,
+        "error": None,
+    }
+    keys = []
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            # Search
+            match = searcher.search(so_hieu)
+            record["match"] = match.to_dict()
+
+            if match.confidence == "none":
+                keys.append("no_match")
+                delay.recover(0.9)
+                break
+
+            # Pause between search and enrich
+            delay.sleep()
+
+            # Enrich
+            enriched = scraper.enrich(match)
+            record["validity"] = enriched.validity.to_dict()
+            record["evidence"] = enriched.evidence.to_dict()
+
+            keys.append("fuzzy" if match.confidence == "fuzzy" else "exact")
+            keys.append(f"status_{enriched.validity.status_current}")
+
+            delay.recover(0.8)
+            break
+
+        except Exception as e:
+            logger.warning("  Attempt %d/%d %s: %s", attempt, MAX_RETRIES, so_hieu, e)
+            delay.backoff()
+            if attempt < MAX_RETRIES:
+                delay.sleep()
+            else:
+                record["error"] = str(e)
+                keys.append("error")
+
+    # Polite delay
+    delay.sleep()
+    return record, keys
+
+
+def run_enrichment(docs: list[dict], fresh: bool = False, workers: int = DEFAULT_WORKERS):
+    """
+    Enrich every cached doc not yet in the output JSONL.
+
+    With ``workers > 1`` documents are searched/enriched in a thread pool so
+    their HTTP round-trips overlap; the crawlers' own rate limiters still
+    space out requests to vbpl.vn, and all workers pause on one shared
+    AdaptiveDelay so backoff after a failure slows every worker. Records are
+    written only from this (main) thread as they complete, so resume order
+    may differ from cache order.
+    """
+    from src.crawlers.http_utils import AdaptiveDelay, make_session
     from src.crawlers.vbpl_searcher import VBPLSearcher
     from src.crawlers.vbpl_status import VBPLStatusScraper
     from tqdm import tqdm
 
     if fresh and OUTPUT_JSONL.exists():
         OUTPUT_JSONL.unlink()
+        _done_path().unlink(missing_ok=True)
 
     done = load_checkpoint()
     remaining = [d for d in docs if d["so_hieu"] not in done]
@@ -131,69 +242,43 @@ def run_enrichment(docs: list[dict], fresh: bool = False):
         logger.info("Nothing to do!")
         return
 
-    searcher = VBPLSearcher(delay=BASE_DELAY)
-    scraper = VBPLStatusScraper(delay=BASE_DELAY)
-    current_delay = BASE_DELAY
+    # One pooled keep-alive session shared by the searcher and the scraper
+    session = make_session()
+    searcher = VBPLSearcher(delay=BASE_DELAY, session=session)
+    scraper = VBPLStatusScraper(delay=BASE_DELAY, session=session)
+    delay = AdaptiveDelay(BASE_DELAY, MAX_DELAY, factor=BACKOFF_FACTOR, jitter=JITTER_MAX)
     stats = Counter()
 
-    pbar = tqdm(remaining, desc="Enriching", unit="doc")
-    for item in pbar:
-        so_hieu = item["so_hieu"]
-        pbar.set_postfix_str(f"{so_hieu[:25]} d={current_delay:.1f}")
-
-        record = {
-            "original": item,
-            "match": None,
-            "validity": None,
-            "evidence": None,
-            "error": None,
-        }
-
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                # Search
-                match = searcher.search(so_hieu)
-                record["match"] = match.to_dict()
-
-                if match.confidence == "none":
-                    stats["no_match"] += 1
-                    current_delay = max(BASE_DELAY, current_delay * 0.9)
-                    break
-
-                # Pause between search and enrich
-                time.sleep(current_delay + random.uniform(0, JITTER_MAX))
-
-                # Enrich
-                enriched = scraper.enrich(match)
-                record["validity"] = enriched.validity.to_dict()
-                record["evidence"] = enriched.evidence.to_dict()
-
-                if match.confidence == "fuzzy":
-                    stats["fuzzy"] += 1
-                else:
-                    stats["exact"] += 1
-
-                st = enriched.validity.status_current
-                stats[f"status_{st}"] += 1
-
-                current_delay = max(BASE_DELAY, current_delay * 0.8)
-                break
-
-            except Exception as e:
-                logger.warning("  Attempt %d/%d %s: %s", attempt, MAX_RETRIES, so_hieu, e)
-                current_delay = min(current_delay * BACKOFF_FACTOR, MAX_DELAY)
-                if attempt < MAX_RETRIES:
-                    time.sleep(current_delay + random.uniform(0, JITTER_MAX))
-                else:
-                    record["error"] = str(e)
-                    stats["error"] += 1
-
-        # Write result
-        with open(OUTPUT_JSONL, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-        # Polite delay
-        time.sleep(current_delay + random.uniform(0, JITTER_MAX))
+    # One handle for the whole run instead of an open/close per record; the
+    # sidecar is appended after the JSONL, so a crash in between leaves the
+    # sizes mismatched and resume rescans the JSONL
+    with open(OUTPUT_JSONL, "a", encoding="utf-8", buffering=1) as out_f, \
+            open(_done_path(), "a", encoding="utf-8", buffering=1) as done_f:
+        def write_record(record: dict, keys: list[str]):
+            # Line-buffered: each record hits the file as it completes
+            out_f.write(json_line(record))
+            size = os.fstat(out_f.fileno()).st_size
+            done_f.write(f"{record['original']['so_hieu']}\t{size}\n")
+            stats.update(keys)
+
+        if workers <= 1:
+            pbar = tqdm(remaining, desc="Enriching", unit="doc")
+            for item in pbar:
+                pbar.set_postfix_str(f"{item['so_hieu'][:25]} d={delay.value:.1f}")
+                record, keys = _enrich_with_retries(item, searcher, scraper, delay)
+                write_record(record, keys)
+        else:
+            pbar = tqdm(total=len(remaining), desc="Enriching", unit="doc")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_enrich_with_retries, item, searcher, scraper, delay): item
+                    for item in remaining
+                }
+                for fut in as_completed(futures):
+                    record, keys = fut.result()
+                    write_record(record, keys)
+                    pbar.set_postfix_str(f"{futures[fut]['so_hieu'][:25]} d={delay.value:.1f}")
+                    pbar.update(1)
 
     pbar.close()
     logger.info("BATCH COMPLETE: processed %d", len(remaining))
@@ -205,37 +290,44 @@ def run_enrichment(docs: list[dict], fresh: bool = False):
 # Stats
 # ──────────────────────────────────────
 
-def compute_stats():
-    if not OUTPUT_JSONL.exists():
-        print("No output file found.")
-        return
-
-    records = []
-    with open(OUTPUT_JSONL, encoding="utf-8") as f:
+def _iter_records(path: Path):
+    """Yield parsed JSONL records, skipping blank and malformed lines."""
+    with open(path, "rb") as f:
         for line in f:
             if line.strip():
                 try:
-                    records.append(json.loads(line))
+                    yield json_loads(line)
                 except json.JSONDecodeError:
                     pass
 
-    total = len(records)
+
+def compute_stats():
+    if not OUTPUT_JSONL.exists():
+        print("No output file found.")
+        return
+
+    # One streaming pass over the JSONL; records are never held in memory
+    total = 0
+    errors = 0
+    match_conf = Counter()
+    status_dist = Counter()
+    event_counts = []
+    for r in _iter_records(OUTPUT_JSONL):
+        total += 1
+        m = r.get("match")
+        match_conf[m.get("confidence", "missing") if m else "missing"] += 1
+        v = r.get("validity")
+        if v:
+            status_dist[v.get("status_current", "unknown")] += 1
+            event_counts.append(len(v.get("events", ())))
+        else:
+            status_dist["no_data"] += 1
+        if r.get("error"):
+            errors += 1
+
     if not total:
         return
 
-    match_conf = Counter(
-        r.get("match", {}).get("confidence", "missing") if r.get("match") else "missing"
-        for r in records
-    )
-    status_dist = Counter(
-        r.get("validity", {}).get("status_current", "unknown") if r.get("validity") else "no_data"
-        for r in records
-    )
-    errors = sum(1 for r in records if r.get("error"))
-    event_counts = [
-        len(r.get("validity", {}).get("events", []))
-        for r in records if r.get("validity")
-    ]
     avg_events = sum(event_counts) / max(len(event_counts), 1)
 
     stats = {
@@ -247,8 +339,7 @@ def compute_stats():
         "max_events": max(event_counts) if event_counts else 0,
         "with_events": sum(1 for c in event_counts if c > 0),
     }
-    with open(STATS_JSON, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    write_json(STATS_JSON, stats)
 
     print("\n" + "=" * 60)
     print("📊 ENRICHMENT STATISTICS")
@@ -280,6 +371,8 @@ if __name__ == "__main__":
                         help="cache=build cache, run=enrichment, stats=print stats, all=cache+run+stats")
     parser.add_argument("--limit", type=int, default=0)
     parser.add_argument("--fresh", action="store_true", help="Start fresh (delete old JSONL)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Documents enriched concurrently (default: {DEFAULT_WORKERS}, 1 = sequential)")
     args = parser.parse_args()
 
     if args.action in ("cache", "all"):
@@ -287,8 +380,7 @@ if __name__ == "__main__":
 
     if args.action in ("run", "all"):
         if CACHE_FILE.exists():
-            with open(CACHE_FILE, encoding="utf-8") as f:
-                docs = json.load(f)
+            docs = read_json(CACHE_FILE)
         else:
             docs = build_cache()
 
@@ -296,7 +388,7 @@ if __name__ == "__main__":
             docs = docs[:args.limit]
             logger.info("Limited to %d docs", args.limit)
 
-        run_enrichment(docs, fresh=args.fresh)
+        run_enrichment(docs, fresh=args.fresh, workers=args.workers)
 
     if args.action in ("stats", "all"):
         compute_stats()
@@ -0,0 +1,241 @@
+"""
+Shared HTTP helpers for the VBPL crawlers.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 32
+
+
+def make_session(headers: dict | None = None) -> requests.Session:
+    """
+    Keep-alive session with a pooled adapter for vbpl.vn.
+
+    Connection errors are retried with backoff at the transport level;
+    429/503 throttling is left to the crawlers' own ``_fetch`` loops.
+    Pass the same session to several crawlers to share the pool.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        # Without respect_retry_after_header=False urllib3 would itself retry
+        # (and sleep on) 429/503 responses that carry Retry-After
+        max_retries=Retry(total=3, backoff_factor=0.5, respect_retry_after_header=False),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+class AdaptiveDelay:
+    """
+    Polite pause between documents, shared by every worker of a run.
+
+    Failures multiply it by *factor* (capped at *maximum*); successes let it
+    recover towards *base*. Workers read the current value before each
+    pause, so backoff after one throttled document slows all of them, just
+    as it did when documents were processed one at a time.
+    """
+
+    def __init__(self, base: float, maximum: float, factor: float = 2.0, jitter: float = 0.0):
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._value = base
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+    def backoff(self) -> float:
+        """Grow the delay after a failure; returns the new value."""
+        with self._lock:
+            self._value = min(self._value * self.factor, self.maximum)
+            return self._value
+
+    def recover(self, rate: float) -> float:
+        """Shrink the delay by *rate* after a success, never below base."""
+        with self._lock:
+            self._value = max(self.base, self._value * rate)
+            return self._value
+
+    def sleep(self) -> None:
+        """Pause for the current delay plus up to *jitter* seconds."""
+        time.sleep(self.value + random.uniform(0, self.jitter))
+
+
+def retry_after_seconds(resp: requests.Response, default: float) -> float:
+    """
+    Seconds to wait before retrying a throttled response.
+
+    Honours the ``Retry-After`` header (delta-seconds or HTTP-date);
+    falls back to *default* when it is missing or unparseable.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HTTPCache:
+    """
+    Gzipped on-disk cache of GET response bodies, one file per URL.
+
+    Entries keep the ``ETag`` / ``Last-Modified`` validators so callers can
+    revalidate with a conditional request (see ``conditional_headers``) and
+    the time they were stored (``fetched_at``), so entries without validators
+    can be expired by age (see ``PoliteClient._fetch``). With ``refresh=True``
+    lookups always miss but fresh responses are still stored, which
+    invalidates whatever was cached before.
+    """
+
+    def __init__(self, directory: str | Path, refresh: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.refresh = refresh
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json.gz"
+
+    def get(self, url: str) -> dict | None:
+        """Cached ``{"url", "etag", "last_modified", "fetched_at", "body"}`` or None."""
+        if self.refresh:
+            return None
+        try:
+            with gzip.open(self._path(url), "rb") as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url: str, resp: requests.Response) -> None:
+        entry = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "body": resp.text,
+        }
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """``If-None-Match`` / ``If-Modified-Since`` for a cached entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+class PoliteClient:
+    """
+    Base for the vbpl.vn clients: a (possibly shared) session, a minimum
+    delay between requests and an optional on-disk ``HTTPCache``.
+    """
+
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    }
+    MAX_FETCH_RETRIES = 3
+
+    def __init__(
+        self,
+        delay: float,
+        session: requests.Session | None = None,
+        cache: HTTPCache | None = None,
+    ):
+        self.session = session or make_session()
+        self.session.headers.update(self.HEADERS)
+        self.delay = delay
+        self.cache = cache
+        self._last_request_time: float = 0
+        self._rate_lock = threading.Lock()
+
+    def _rate_limit(self):
+        """Enforce minimum delay between requests."""
+        # Serialised so concurrent workers sharing this instance stay polite
+        with self._rate_lock:
+            elapsed = time.time() - self._last_request_time
+            if elapsed < self.delay:
+                time.sleep(self.delay - elapsed)
+            self._last_request_time = time.time()
+
+    def _fetch(self, url: str, cacheable: bool = False,
+               max_age: float | None = None) -> str:
+        """
+        Fetch a page with rate limiting, backing off on 429/503.
+
+        With *cacheable* and a ``cache`` configured, a cached body is reused:
+        after a conditional request answered with 304 if it carries
+        validators, otherwise directly - unless *max_age* is given and the
+        entry is older than that many seconds, in which case it is refetched.
+        """
+        cache = self.cache if cacheable else None
+        entry = cache.get(url) if cache else None
+        headers = None
+        if entry:
+            headers = HTTPCache.conditional_headers(entry)
+            if not headers:
+                age = time.time() - entry.get("fetched_at", 0)
+                if max_age is None or age < max_age:
+                    logger.debug("Cache hit: %s", url)
+                    return entry["body"]
+                logger.debug("Cache expired (%.0fs old): %s", age, url)
+                entry = None
+
+        for attempt in range(self.MAX_FETCH_RETRIES + 1):
+            self._rate_limit()
+            logger.debug("Fetching: %s", url)
+            resp = self.session.get(url, timeout=30, headers=headers)
+            if resp.status_code not in (429, 503) or attempt == self.MAX_FETCH_RETRIES:
+                break
+            wait = retry_after_seconds(resp, self.delay * (2 ** attempt))
+            logger.warning("  HTTP %d for %s, retrying in %.1fs",
+                           resp.status_code, url, wait)
+            time.sleep(wait)
+        if entry and resp.status_code == 304:
+            logger.debug("Not modified: %s", url)
+            return entry["body"]
+        resp.raise_for_status()
+        if cache:
+            cache.put(url, resp)
+        return resp.text
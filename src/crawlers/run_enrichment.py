@@ -13,6 +13,7 @@ Usage:
     python -m src.crawlers.run_enrichment                     # all central-type tax docs
     python -m src.crawlers.run_enrichment --limit 20          # first 20 only
     python -m src.crawlers.run_enrichment --resume             # skip already-done
+    python -m src.crawlers.run_enrichment --workers 1          # one doc at a time
 """
 
 from __future__ import annotations
@@ -21,10 +22,9 @@ import argparse
 import json
 import logging
 import os
-import random
 import sys
-import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict
 from pathlib import Path
 
@@ -33,9 +33,11 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from tqdm import tqdm
 
+from src.crawlers.http_utils import AdaptiveDelay, make_session
 from src.crawlers.models import VBPLMatch, EnrichedDocument
 from src.crawlers.vbpl_searcher import VBPLSearcher
 from src.crawlers.vbpl_status import VBPLStatusScraper
+from json_utils import json_line, json_loads, write_json
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +56,7 @@ JITTER_MAX = 1.0          # random jitter 0..JITTER_MAX added to delay
 BACKOFF_FACTOR = 2.0      # multiply delay on error
 MAX_DELAY = 60.0           # cap on backoff delay
 MAX_RETRIES = 3            # per-document retries
+DEFAULT_WORKERS = 4        # documents in flight at once
 
 
 # ──────────────────────────────────────────────
@@ -111,7 +114,7 @@ def load_checkpoint(output_path: Path) -> set[str]:
                 if not line:
                     continue
                 try:
-                    record = json.loads(line)
+                    record = json_loads(line)
                     sh = record.get("original", {}).get("so_hieu", "")
                     if sh:
                         done.add(sh)
@@ -123,15 +126,7 @@ def load_checkpoint(output_path: Path) -> set[str]:
 def append_result(output_path: Path, record: dict):
     """Append one JSON record as a line to the output JSONL."""
     with open(output_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-
-def adaptive_sleep(current_delay: float) -> float:
-    """Sleep with jitter, return the delay used."""
-    jitter = random.uniform(0, JITTER_MAX)
-    total = current_delay + jitter
-    time.sleep(total)
-    return total
+        f.write(json_line(record))
 
 
 # ──────────────────────────────────────────────
@@ -142,13 +137,13 @@ def enrich_one(
     item: dict,
     searcher: VBPLSearcher,
     scraper: VBPLStatusScraper,
-    current_delay: float,
-) -> tuple[dict, float]:
+    delay: AdaptiveDelay,
+) -> dict:
     """
     Run search → enrich for a single document.
 
-    Returns (record_dict, updated_delay).
-    The delay may increase on errors (backoff) or decrease on success.
+    Returns the record dict. The shared *delay* is increased on errors
+    (backoff) or decreased on success.
     """
     so_hieu = item["so_hieu"].strip()
 
@@ -168,7 +163,6 @@ def enrich_one(
         "error": None,
     }
 
-    delay = current_delay
     last_error: Exception | None = None
 
     for attempt in range(1, MAX_RETRIES + 1):
@@ -179,10 +173,11 @@ def enrich_one(
 
             if match.confidence == "none":
                 # No match found — skip enrichment
-                return record, max(BASE_DELAY, delay * 0.9)
+                delay.recover(0.9)
+                return record
 
             # Polite pause between search and enrich
-            adaptive_sleep(delay)
+            delay.sleep()
 
             # Step 2: Enrich (thuộc tính + lịch sử)
             enriched = scraper.enrich(match)
@@ -190,8 +185,8 @@ def enrich_one(
             record["evidence"] = enriched.evidence.to_dict()
 
             # Success → ease delay back toward baseline
-            delay = max(BASE_DELAY, delay * 0.8)
-            return record, delay
+            delay.recover(0.8)
+            return record
 
         except Exception as e:
             last_error = e
@@ -199,13 +194,41 @@ def enrich_one(
                 "  Attempt %d/%d for %s failed: %s",
                 attempt, MAX_RETRIES, so_hieu, e,
             )
-            delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
+            delay.backoff()
             if attempt < MAX_RETRIES:
-                adaptive_sleep(delay)
+                delay.sleep()
 
     # All retries exhausted
     record["error"] = str(last_error)
-    return record, delay
+    return record
+
+
+def enrich_and_pause(
+    item: dict,
+    searcher: VBPLSearcher,
+    scraper: VBPLStatusScraper,
+    delay: AdaptiveDelay,
+) -> dict:
+    """enrich_one, then the polite pause before the next document."""
+    record = enrich_one(item, searcher, scraper, delay)
+    delay.sleep()
+    return record
+
+
+def record_stats(record: dict, stats: Counter):
+    """Update batch counters from one finished record."""
+    if record.get("error"):
+        stats["error"] += 1
+    elif record["match"] and record["match"]["confidence"] == "none":
+        stats["no_match"] += 1
+    elif record["match"] and record["match"]["confidence"] == "fuzzy":
+        stats["fuzzy"] += 1
+    else:
+        stats["exact"] += 1
+
+    if record.get("validity"):
+        status = record["validity"].get("status_current", "unknown")
+        stats[f"status_{status}"] += 1
 
 
 # ──────────────────────────────────────────────
@@ -226,6 +249,8 @@ def main():
                         help="Resume from checkpoint (skip already-done)")
     parser.add_argument("--no-resume", action="store_true",
                         help="Start fresh (overwrite output)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Documents enriched concurrently (default: {DEFAULT_WORKERS}, 1 = sequential)")
     args = parser.parse_args()
 
     # Setup logging
@@ -254,6 +279,8 @@ def main():
     # Checkpoint
     if args.no_resume and output_jsonl.exists():
         output_jsonl.unlink()
+        # run_tax_enrichment.py's resume sidecar for the same output
+        output_jsonl.with_suffix(".done").unlink(missing_ok=True)
         logger.info("Cleared previous output")
 
     done = load_checkpoint(output_jsonl) if not args.no_resume else set()
@@ -268,38 +295,43 @@ def main():
         print_stats(output_jsonl, stats_json)
         return
 
-    # Init crawlers with polite delays
-    searcher = VBPLSearcher(delay=args.delay)
-    scraper = VBPLStatusScraper(delay=args.delay)
+    # Init crawlers with polite delays, sharing one pooled keep-alive session
+    session = make_session()
+    searcher = VBPLSearcher(delay=args.delay, session=session)
+    scraper = VBPLStatusScraper(delay=args.delay, session=session)
 
-    # Run
-    current_delay = args.delay
+    # Run; one adaptive delay shared by every worker, so backoff after a
+    # failure slows them all
+    delay = AdaptiveDelay(args.delay, MAX_DELAY, factor=BACKOFF_FACTOR, jitter=JITTER_MAX)
     stats = Counter()
 
-    pbar = tqdm(remaining, desc="Enriching", unit="doc")
-    for item in pbar:
-        so_hieu = item["so_hieu"].strip()
-        pbar.set_postfix_str(f"{so_hieu[:25]}  delay={current_delay:.1f}s")
-
-        record, current_delay = enrich_one(item, searcher, scraper, current_delay)
-        append_result(output_jsonl, record)
-
-        # Track stats
-        if record.get("error"):
-            stats["error"] += 1
-        elif record["match"] and record["match"]["confidence"] == "none":
-            stats["no_match"] += 1
-        elif record["match"] and record["match"]["confidence"] == "fuzzy":
-            stats["fuzzy"] += 1
-        else:
-            stats["exact"] += 1
-
-        if record.get("validity"):
-            status = record["validity"].get("status_current", "unknown")
-            stats[f"status_{status}"] += 1
-
-        # Polite delay before next document
-        adaptive_sleep(current_delay)
+    if args.workers <= 1:
+        pbar = tqdm(remaining, desc="Enriching", unit="doc")
+        for item in pbar:
+            so_hieu = item["so_hieu"].strip()
+            pbar.set_postfix_str(f"{so_hieu[:25]}  delay={delay.value:.1f}s")
+
+            record = enrich_and_pause(item, searcher, scraper, delay)
+            append_result(output_jsonl, record)
+            record_stats(record, stats)
+    else:
+        # Network-bound: overlap documents in threads. The crawlers' own rate
+        # limiters still space out requests; results are appended only from
+        # this (main) thread, in completion order.
+        pbar = tqdm(total=len(remaining), desc="Enriching", unit="doc")
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(enrich_and_pause, item, searcher, scraper, delay): item
+                for item in remaining
+            }
+            for fut in as_completed(futures):
+                record = fut.result()
+                append_result(output_jsonl, record)
+                record_stats(record, stats)
+                pbar.set_postfix_str(
+                    f"{futures[fut]['so_hieu'].strip()[:25]}  delay={delay.value:.1f}s"
+                )
+                pbar.update(1)
 
     pbar.close()
 
@@ -324,7 +356,7 @@ def print_stats(output_jsonl: Path, stats_json: Path):
             line = line.strip()
             if line:
                 try:
-                    records.append(json.loads(line))
+                    records.append(json_loads(line))
                 except json.JSONDecodeError:
                     pass
 
@@ -362,8 +394,7 @@ def print_stats(output_jsonl: Path, stats_json: Path):
         "with_events": sum(1 for c in event_counts if c > 0),
     }
 
-    with open(stats_json, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    write_json(stats_json, stats)
 
     print("\n" + "="*60)
     print("📊 ENRICHMENT STATISTICS")
@@ -0,0 +1,43 @@
+"""
+On-disk helpers for crawled content.
+
+Paths ending in ``.zst`` are transparently zstd-compressed (requires the
+optional ``zstandard`` package); anything else is plain UTF-8 text.
+"""
+
+import os
+
+ZSTD_LEVEL = 3
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "zstandard is required for .zst files: pip install zstandard"
+        ) from e
+    return zstandard
+
+
+def write_text(path: str, text: str) -> None:
+    """Atomically write *text* to *path* (temp file + ``os.replace``)."""
+    tmp_path = f"{path}.tmp"
+    if path.endswith(".zst"):
+        cctx = _zstd().ZstdCompressor(level=ZSTD_LEVEL)
+        with open(tmp_path, "wb") as raw, cctx.stream_writer(raw) as f:
+            f.write(text.encode("utf-8"))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    os.replace(tmp_path, path)
+
+
+def read_text(path: str) -> str:
+    """Read a file written by :func:`write_text`."""
+    if path.endswith(".zst"):
+        dctx = _zstd().ZstdDecompressor()
+        with open(path, "rb") as raw, dctx.stream_reader(raw) as f:
+            return f.read().decode("utf-8")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
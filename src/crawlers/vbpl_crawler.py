@@ -15,16 +15,18 @@ For each new doc found:
   3. Parse with existing parsers module
 """
 
+import os
 import re
-import time
 import logging
 from typing import Optional
 from urllib.parse import urlencode
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
+from .http_utils import HTTPCache, PoliteClient
 from .models import VBPLMatch
+from .storage import write_text
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +46,7 @@ LOAI_VAN_BAN_IDS: dict[str, int] = {
 }
 
 
-class VBPLCrawler:
+class VBPLCrawler(PoliteClient):
     """
     Step 3: Discover and crawl new documents from vbpl.vn.
 
@@ -59,31 +61,22 @@ class VBPLCrawler:
     """
 
     AJAX_BASE = "https://vbpl.vn/VBQPPL_UserControls/Publishing/TimKiem/pKetQuaTimKiem.aspx"
-    HEADERS = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
 
     RE_ITEM_ID = re.compile(r"ItemID=(\d+)")
     RE_TOTAL = re.compile(r"Tìm thấy\s*<b>(\d+)</b>")
+    RE_REDIRECT = re.compile(r"window\.location\.href\s*=\s*'([^']+)'")
+    RE_SO_HIEU = re.compile(r"(\d+/\d{4}/[A-ZĐa-zđ\-]+)")
+    RE_VBGOC = re.compile(r'pViewVBGoc\.aspx\?([^"]+)')
+    # crawl_toanvan only reads the full-text div: skip building the page chrome
+    TOANVAN_STRAINER = SoupStrainer("div", id="toanvancontent")
 
-    def __init__(self, delay: float = 1.5):
-        self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
-        self.delay = delay
-        self._last_request_time: float = 0
-
-    def _rate_limit(self):
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self._last_request_time = time.time()
-
-    def _fetch(self, url: str) -> str:
-        self._rate_limit()
-        logger.debug("Fetching: %s", url)
-        resp = self.session.get(url, timeout=30)
-        resp.raise_for_status()
-        return resp.text
+    def __init__(
+        self,
+        delay: float = 1.5,
+        session: requests.Session | None = None,
+        cache: HTTPCache | None = None,
+    ):
+        super().__init__(delay, session=session, cache=cache)
 
     def _build_browse_url(
         self,
@@ -119,7 +112,7 @@ class VBPLCrawler:
         results: list[VBPLMatch] = []
 
         # Handle single-result redirect
-        redirect_match = re.search(r"window\.location\.href\s*=\s*'([^']+)'", html)
+        redirect_match = self.RE_REDIRECT.search(html)
         if redirect_match:
             url = redirect_match.group(1)
             id_match = self.RE_ITEM_ID.search(url)
@@ -166,7 +159,7 @@ class VBPLCrawler:
                     trang_thai = text.replace("Trạng thái:", "").strip()
 
             # Extract so_hieu from title (e.g. "Thông tư 80/2021/TT-BTC" → "80/2021/TT-BTC")
-            so_hieu_match = re.search(r"(\d+/\d{4}/[A-ZĐa-zđ\-]+)", title_text)
+            so_hieu_match = self.RE_SO_HIEU.search(title_text)
             so_hieu = so_hieu_match.group(1) if so_hieu_match else title_text
 
             results.append(VBPLMatch(
@@ -252,7 +245,12 @@ class VBPLCrawler:
 
         return all_results
 
-    def crawl_toanvan(self, item_id: int, path_segment: str = "TW") -> dict:
+    def crawl_toanvan(
+        self,
+        item_id: int,
+        path_segment: str = "TW",
+        html_path: Optional[str] = None,
+    ) -> dict:
         """
         Fetch the full text content of a document.
 
@@ -265,11 +263,17 @@ class VBPLCrawler:
         Args:
             item_id: VBPL ItemID
             path_segment: e.g. "TW", "botaichinh"
+            html_path: If given, the toàn văn HTML is written to this file
+                (via a temp file + atomic rename) instead of being returned
+                in ``content_html``; zstd-compressed if it ends in ``.zst``.
 
         Returns:
             Dict with keys:
               - page_url:      URL of the toàn văn page
-              - content_html:  inner HTML of div#toanvancontent (or None)
+              - content_html:  inner HTML of div#toanvancontent (or None;
+                               always None when ``html_path`` is given)
+              - content_html_path: ``html_path`` if the HTML was saved (or None)
+              - content_html_len:  length of the HTML in characters
               - content_text:  plain-text extracted from toanvancontent (or None)
               - pdf_url:       direct link to the PDF file (or None)
               - pdf_filename:  filename of the PDF (or None)
@@ -279,12 +283,14 @@ class VBPLCrawler:
             f"https://vbpl.vn/{path_segment}/Pages/"
             f"vbpq-toanvan.aspx?ItemID={item_id}"
         )
-        page_html = self._fetch(page_url)
-        soup = BeautifulSoup(page_html, "html.parser")
+        page_html = self._fetch(page_url, cacheable=True)
+        soup = BeautifulSoup(page_html, "html.parser", parse_only=self.TOANVAN_STRAINER)
 
         result: dict = {
             "page_url": page_url,
             "content_html": None,
+            "content_html_path": None,
+            "content_html_len": 0,
             "content_text": None,
             "pdf_url": None,
             "pdf_filename": None,
@@ -294,7 +300,13 @@ class VBPLCrawler:
         # ----- Strategy 1: server-rendered HTML in div#toanvancontent -----
         toanvan_div = soup.find("div", id="toanvancontent")
         if toanvan_div and len(toanvan_div.get_text(strip=True)) > 200:
-            result["content_html"] = str(toanvan_div)
+            content_html = str(toanvan_div)
+            result["content_html_len"] = len(content_html)
+            if html_path:
+                write_text(html_path, content_html)
+                result["content_html_path"] = html_path
+            else:
+                result["content_html"] = content_html
             result["content_text"] = toanvan_div.get_text("\n", strip=True)
             result["source"] = "html"
             logger.info(
@@ -314,7 +326,7 @@ class VBPLCrawler:
 
     def _extract_pdf_url(self, page_html: str, result: dict) -> None:
         """Populate *result* with ``pdf_url`` / ``pdf_filename`` if found."""
-        vbgoc_match = re.search(r'pViewVBGoc\.aspx\?([^"]+)', page_html)
+        vbgoc_match = self.RE_VBGOC.search(page_html)
         if not vbgoc_match:
             return
         ajax_url = (
@@ -322,7 +334,7 @@ class VBPLCrawler:
             f"pViewVBGoc.aspx?{vbgoc_match.group(1)}"
         )
         try:
-            ajax_html = self._fetch(ajax_url)
+            ajax_html = self._fetch(ajax_url, cacheable=True)
             soup = BeautifulSoup(ajax_html, "html.parser")
             obj_tag = soup.find("object", attrs={"type": "application/pdf"})
             if obj_tag and obj_tag.get("data"):
@@ -350,7 +362,6 @@ class VBPLCrawler:
         resp = self.session.get(pdf_url, timeout=60, stream=True)
         resp.raise_for_status()
 
-        import os
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
         with open(save_path, "wb") as f:
@@ -12,7 +12,6 @@ Two response modes:
 """
 
 import re
-import time
 import logging
 import unicodedata
 from urllib.parse import quote, urlencode
@@ -21,6 +20,7 @@ from typing import Optional
 import requests
 from bs4 import BeautifulSoup
 
+from .http_utils import PoliteClient
 from .models import VBPLMatch
 
 logger = logging.getLogger(__name__)
@@ -40,7 +40,7 @@ PATH_TO_DVID: dict[str, int] = {
 DEFAULT_DVID = 13
 
 
-class VBPLSearcher:
+class VBPLSearcher(PoliteClient):
     """
     Step 1: Map `so_hieu` to VBPL ItemID.
 
@@ -52,31 +52,22 @@ class VBPLSearcher:
     """
 
     AJAX_BASE = "https://vbpl.vn/VBQPPL_UserControls/Publishing/TimKiem/pKetQuaTimKiem.aspx"
-    HEADERS = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
 
     # Regex to extract redirect URL from JS
     RE_REDIRECT = re.compile(r"window\.location\.href\s*=\s*'([^']+)'")
     # Regex to extract ItemID from URL
     RE_ITEM_ID = re.compile(r"ItemID=(\d+)")
+    # Dash variants (‐ ‑ ‒ – — ―, minus, small/fullwidth hyphen-minus)
+    RE_DASHES = re.compile(r"[\u2010-\u2015\u2212\uFE58\uFE63\uFF0D]")
+    RE_SPACES = re.compile(r"\s+")
 
-    def __init__(self, delay: float = 1.0):
+    def __init__(self, delay: float = 1.0, session: requests.Session | None = None):
         """
         Args:
             delay: Seconds to wait between requests (polite crawling).
+            session: Optional shared HTTP session (see ``make_session``).
         """
-        self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
-        self.delay = delay
-        self._last_request_time: float = 0
-
-    def _rate_limit(self):
-        """Enforce minimum delay between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self._last_request_time = time.time()
+        super().__init__(delay, session=session)
 
     @staticmethod
     def normalise_so_hieu(so_hieu: str) -> str:
@@ -87,8 +78,8 @@ class VBPLSearcher:
         - NFC unicode normalisation
         """
         s = unicodedata.normalize("NFC", so_hieu.strip())
-        s = re.sub(r"[\u2010-\u2015\u2212\uFE58\uFE63\uFF0D]", "-", s)
-        s = re.sub(r"\s+", " ", s)
+        s = VBPLSearcher.RE_DASHES.sub("-", s)
+        s = VBPLSearcher.RE_SPACES.sub(" ", s)
         return s
 
     def _build_search_url(self, keyword: str, dvid: int = DEFAULT_DVID) -> str:
@@ -217,12 +208,8 @@ class VBPLSearcher:
         normalised = self.normalise_so_hieu(so_hieu)
         search_url = self._build_search_url(normalised)
 
-        self._rate_limit()
         logger.debug("Searching: %s", search_url)
-        resp = self.session.get(search_url, timeout=30)
-        resp.raise_for_status()
-
-        html = resp.text
+        html = self._fetch(search_url)
 
         # Case 1: single result → JS redirect
         if "window.location.href" in html:
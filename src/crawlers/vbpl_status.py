@@ -13,13 +13,13 @@ Lịch sử page: vbpq-lichsu.aspx?ItemID={id}
 """
 
 import re
-import time
 import logging
 from typing import Optional
 
 import requests
 from bs4 import BeautifulSoup
 
+from .http_utils import HTTPCache, PoliteClient
 from .models import (
     VBPLMatch,
     HistoryEvent,
@@ -33,7 +33,7 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
-class VBPLStatusScraper:
+class VBPLStatusScraper(PoliteClient):
     """
     Step 2: Fetch thuộc tính + lịch sử and produce EnrichedDocument.
 
@@ -44,31 +44,19 @@ class VBPLStatusScraper:
         print(enriched.validity.events)
     """
 
-    HEADERS = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
 
     RE_ITEM_ID = re.compile(r"ItemID=(\d+)")
-
-    def __init__(self, delay: float = 1.0):
-        self.session = requests.Session()
-        self.session.headers.update(self.HEADERS)
-        self.delay = delay
-        self._last_request_time: float = 0
-
-    def _rate_limit(self):
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self._last_request_time = time.time()
-
-    def _fetch(self, url: str) -> str:
-        """Fetch a page with rate limiting."""
-        self._rate_limit()
-        logger.debug("Fetching: %s", url)
-        resp = self.session.get(url, timeout=30)
-        resp.raise_for_status()
-        return resp.text
+    # Status and amendment history change after issue, so cached thuộc tính /
+    # lịch sử pages without validators are only trusted for this long
+    STATUS_MAX_AGE = 6 * 3600
+
+    def __init__(
+        self,
+        delay: float = 1.0,
+        session: requests.Session | None = None,
+        cache: HTTPCache | None = None,
+    ):
+        super().__init__(delay, session=session, cache=cache)
 
     # ──────────────────────────────────────────
     # Thuộc tính parser
@@ -296,7 +284,7 @@ class VBPLStatusScraper:
         # 1. Fetch Thuộc tính
         tt_url = match.detail_url("vbpq-thuoctinh")
         try:
-            tt_html = self._fetch(tt_url)
+            tt_html = self._fetch(tt_url, cacheable=True, max_age=self.STATUS_MAX_AGE)
             evidence.record(tt_url, tt_html)
 
             tt_data = self.parse_thuoctinh(tt_html)
@@ -328,7 +316,7 @@ class VBPLStatusScraper:
         # 2. Fetch Lịch sử
         ls_url = match.detail_url("vbpq-lichsu")
         try:
-            ls_html = self._fetch(ls_url)
+            ls_html = self._fetch(ls_url, cacheable=True, max_age=self.STATUS_MAX_AGE)
             evidence.record(ls_url, ls_html)
 
             events = self.parse_lichsu(ls_html)